@@ -1,26 +1,26 @@
 \
 from __future__ import annotations
+import hashlib
 import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
 import click
 
-from .extract import extract_all, extract_gender
-from .normalize import load_registry, normalize_triples_with_nulls, _build_alias_map, _best_match
+from . import extract, utils
+from .extract import extract_everything, BACKENDS, DEFAULT_BACKEND
+from .normalize import load_registry, normalize_triples_with_nulls_batch, _build_alias_map, _build_exact_map, _best_matches
+from .utils import clean_text
 from .schema import load_json, save_json
 from .model_filler import fill_null_values_with_means, check_model_completeness
 
-# Optional SageMaker import
-try:
-    from .sagemaker import predict_bioage
-    SAGEMAKER_AVAILABLE = True
-except ImportError:
-    SAGEMAKER_AVAILABLE = False
-    predict_bioage = None
-
 @click.command()
-@click.option("--pdf", "pdf_path", required=True, type=click.Path(exists=True, dir_okay=False), help="Input lab-report PDF")
+@click.option("--pdf", "pdf_paths", required=True, multiple=True, type=click.Path(exists=True, dir_okay=False), help="Input lab-report PDF (repeat for several; --out is then a directory)")
 @click.option("--json", "json_path", required=True, type=click.Path(exists=True, dir_okay=False), help="Input JSON template to update")
-@click.option("--out", "out_path", required=False, type=click.Path(dir_okay=False), help="Output JSON path (defaults to overwrite input)")
+@click.option("--out", "out_path", required=False, type=click.Path(), help="Output JSON path (defaults to overwrite input); output directory when several PDFs are given")
 @click.option("--registry", "registry_path", default=str(Path(__file__).resolve().parents[2] / "data" / "canonical_parameters.yaml"), help="Canonical parameter registry YAML")
 @click.option("--strict-level", default=1, show_default=True, type=click.IntRange(0,2), help="0=loose, 1=balanced, 2=strict matching")
 @click.option("--sagemaker", "sagemaker_endpoint", required=False, help="AWS SageMaker endpoint URL for bioage prediction")
@@ -29,15 +29,117 @@ except ImportError:
 @click.option("--model-type", default="cvd", type=click.Choice(["cvd", "liver", "kidney"]), show_default=True, help="Model type for null value filling")
 @click.option("--fill-nulls", is_flag=True, help="Fill null values with mean values before SageMaker prediction")
 @click.option("--check-completeness", is_flag=True, help="Check data completeness for the specified model")
-def main(pdf_path, json_path, out_path, registry_path, strict_level, sagemaker_endpoint, aws_region, predict, model_type, fill_nulls, check_completeness):
-    # Extract lab parameters
-    triples = extract_all(pdf_path)
+@click.option("--backend", default=DEFAULT_BACKEND, type=click.Choice(list(BACKENDS)), show_default=True, help="PDF extraction backend (pdfplumber is the fallback when PyMuPDF table detection fails)")
+@click.option("--force-text-scan", is_flag=True, help="Also parse free text on pages where tables were found")
+@click.option("--verbose/--quiet", default=True, show_default=True, help="Show per-parameter messages when filling null values")
+@click.option("--cache-parsed", "cache_path", required=False, type=click.Path(dir_okay=False), help="JSON file caching extracted values per PDF; PDFs unchanged since they were cached skip extraction")
+def main(pdf_paths, json_path, out_path, registry_path, strict_level, sagemaker_endpoint, aws_region, predict, model_type, fill_nulls, check_completeness, backend, force_text_scan, verbose, cache_path):
     registry = load_registry(registry_path)
-    norm = normalize_triples_with_nulls(triples, registry, strict_level=strict_level)
+    
+    # Build alias map for fuzzy matching, shared by every PDF in this run
+    aliases = _build_alias_map(registry)
+    exact = _build_exact_map(aliases)
+    
+    # Several PDFs each fill their own copy of the template; --out is then a directory.
+    # Output paths are checked before any PDF is extracted
+    multi = len(pdf_paths) > 1
+    out_paths = _output_paths(pdf_paths, json_path, out_path)
+    
+    # Extract lab parameters and gender information in one pass over each PDF,
+    # then match the labels of all PDFs in a single batch
+    extracted = _extract_all(pdf_paths, backend, force_text_scan, cache_path)
+    norms = normalize_triples_with_nulls_batch([triples for triples, _ in extracted], registry, strict_level=strict_level)
+    
+    jobs = []
+    for pdf_path, (_, gender), norm, out in zip(pdf_paths, extracted, norms, out_paths):
+        if multi:
+            click.echo(f"📄 {pdf_path}")
+        js = _fill_template(gender, norm, json_path, aliases, exact, strict_level, model_type, fill_nulls, check_completeness, verbose)
+        jobs.append((pdf_path, js, out))
+
+    # SageMaker prediction if requested
+    if predict:
+        # Optional SageMaker import, deferred so boto3 only loads for predictions
+        try:
+            from .sagemaker import predict_bioage
+        except ImportError:
+            predict_bioage = None
+        if predict_bioage is None:
+            click.echo("❌ SageMaker integration not available. Please install boto3: pip install boto3")
+            click.echo("Continuing without prediction...")
+        else:
+            if not sagemaker_endpoint:
+                # Use default endpoint if not provided
+                sagemaker_endpoint = "https://runtime.sagemaker.ap-south-1.amazonaws.com/endpoints/cvd-bioage-predictor-endpoint/invocations/"
+            
+            click.echo("🔮 Running bioage prediction...")
+            # Each prediction is a network round-trip, so run them concurrently
+            # and write each output as soon as its prediction comes back
+            with ThreadPoolExecutor(max_workers=min(16, len(jobs))) as executor:
+                futures = {executor.submit(predict_bioage, js, sagemaker_endpoint, aws_region): (pdf_path, js, out) for pdf_path, js, out in jobs}
+                for future in as_completed(futures):
+                    pdf_path, js, out = futures[future]
+                    if multi:
+                        click.echo(f"📄 {pdf_path}")
+                    try:
+                        _show_prediction(js, future.result())
+                    except Exception as e:
+                        click.echo(f"❌ SageMaker prediction failed: {e}")
+                        click.echo("Continuing without prediction...")
+                    _write_output(out, js)
+            return
+
+    for _, js, out in jobs:
+        _write_output(out, js)
+
+@lru_cache(maxsize=None)
+def _extractor_version(backend):
+    """Fingerprint of the extraction code and the backend library it runs on."""
+    h = hashlib.blake2b(digest_size=8)
+    for module in (extract, utils):
+        h.update(Path(module.__file__).read_bytes())
+    try:
+        h.update(metadata.version(backend).encode())
+    except metadata.PackageNotFoundError:
+        pass
+    return h.hexdigest()
 
-    # Extract gender information
-    gender = extract_gender(pdf_path)
+def _extract_all(pdf_paths, backend, force_text_scan, cache_path):
+    """extract_everything for each PDF, reusing --cache-parsed entries whose PDF and options are unchanged."""
+    if not cache_path:
+        return [extract_everything(pdf_path, backend=backend, force_text_scan=force_text_scan) for pdf_path in pdf_paths]
+    
+    try:
+        cache = load_json(cache_path)
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    
+    extracted = []
+    dirty = False
+    for pdf_path in pdf_paths:
+        # One entry per PDF and extraction options, valid while neither the
+        # file nor the extraction code (or backend library) has changed
+        stat = os.stat(pdf_path)
+        stamp = [stat.st_mtime_ns, stat.st_size, _extractor_version(backend)]
+        key = f"{Path(pdf_path).resolve()}|{backend}|{'text-scan' if force_text_scan else 'tables'}"
+        entry = cache.get(key)
+        if not isinstance(entry, dict) or entry.get("stamp") != stamp:
+            triples, gender = extract_everything(pdf_path, backend=backend, force_text_scan=force_text_scan)
+            entry = cache[key] = {"stamp": stamp, "triples": [list(t) for t in triples], "gender": gender}
+            dirty = True
+        extracted.append(([tuple(t) for t in entry["triples"]], entry["gender"]))
     
+    if dirty:
+        # Replace the file atomically so concurrent runs never read a partial cache
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        save_json(tmp, cache)
+        os.replace(tmp, cache_path)
+    return extracted
+
+def _fill_template(gender, norm, json_path, aliases, exact, strict_level, model_type, fill_nulls, check_completeness, verbose):
+    """Return the JSON template updated with one PDF's gender and normalized values."""
     js = load_json(json_path)
     data = js.get("data", [])
     
@@ -48,16 +150,17 @@ def main(pdf_path, json_path, out_path, registry_path, strict_level, sagemaker_e
     else:
         click.echo("No gender information found in PDF")
     
-    # Build alias map for fuzzy matching
-    aliases = _build_alias_map(registry)
+    # Normalise each name once; templates repeat the same names, so intern them.
+    # Names that are exactly an alias skip fuzzy matching; the rest are
+    # fuzzy-matched against the aliases in one batch
+    names = [sys.intern(clean_text(item.get("test_name") or "").lower()) for item in data]
+    matches = [exact.get(name) for name in names]
+    misses = [i for i, m in enumerate(matches) if m is None]
+    for i, canon in zip(misses, _best_matches([names[i] for i in misses], aliases, strict_level=strict_level)):
+        matches[i] = canon
     
     # Update all parameters - found ones get values, missing ones get null
-    for item in data:
-        name = item.get("test_name")
-        
-        # Try to find a match using fuzzy matching
-        matched_canonical = _best_match(name, aliases, strict_level=strict_level)
-        
+    for item, matched_canonical in zip(data, matches):
         if matched_canonical and matched_canonical in norm and norm[matched_canonical]["value"] is not None:
             # Found a match - use the values
             item["value"] = str(norm[matched_canonical]["value"])
@@ -87,45 +190,57 @@ def main(pdf_path, json_path, out_path, registry_path, strict_level, sagemaker_e
     
     # Fill null values if requested
     if fill_nulls:
-        js = fill_null_values_with_means(js, model_type)
+        js = fill_null_values_with_means(js, model_type, echo=verbose)
         click.echo(f"✅ Null values filled with mean values for {model_type.upper()} model")
+    
+    return js
 
-    # SageMaker prediction if requested
-    if predict:
-        if not SAGEMAKER_AVAILABLE:
-            click.echo("❌ SageMaker integration not available. Please install boto3: pip install boto3")
-            click.echo("Continuing without prediction...")
-        else:
-            if not sagemaker_endpoint:
-                # Use default endpoint if not provided
-                sagemaker_endpoint = "https://runtime.sagemaker.ap-south-1.amazonaws.com/endpoints/cvd-bioage-predictor-endpoint/invocations/"
-            
-            try:
-                click.echo("🔮 Running bioage prediction...")
-                prediction = predict_bioage(js, sagemaker_endpoint, aws_region)
-                
-                # Add prediction results to JSON
-                js["prediction"] = prediction
-                click.echo("✅ Bioage prediction completed!")
-                
-                # Display key prediction results
-                if isinstance(prediction, dict):
-                    click.echo("📊 Prediction Results:")
-                    for key, value in prediction.items():
-                        if isinstance(value, (int, float)):
-                            click.echo(f"  {key}: {value}")
-                        elif isinstance(value, dict):
-                            click.echo(f"  {key}:")
-                            for sub_key, sub_value in value.items():
-                                click.echo(f"    {sub_key}: {sub_value}")
-                        else:
-                            click.echo(f"  {key}: {value}")
-                
-            except Exception as e:
-                click.echo(f"❌ SageMaker prediction failed: {e}")
-                click.echo("Continuing without prediction...")
+def _output_paths(pdf_paths, json_path, out_path):
+    """
+    Output JSON path per PDF. Single PDF: --out or the template itself.
+    Several: <pdf stem>.json in --out (or beside each PDF). Raises click.BadParameter
+    for an unusable --out or when two PDFs would write the same file.
+    """
+    if len(pdf_paths) == 1:
+        if out_path and Path(out_path).is_dir():
+            raise click.BadParameter(f"'{out_path}' is a directory; give a file path for a single PDF.", param_hint="'--out'")
+        return [out_path or json_path]
+    
+    if out_path and Path(out_path).exists() and not Path(out_path).is_dir():
+        raise click.BadParameter(f"'{out_path}' is a file; give a directory when several PDFs are given.", param_hint="'--out'")
+    outs = [str((Path(out_path) if out_path else Path(pdf_path).parent) / f"{Path(pdf_path).stem}.json") for pdf_path in pdf_paths]
+    
+    # PDFs with the same name would overwrite each other's output
+    writer = {}
+    for pdf_path, out in zip(pdf_paths, outs):
+        target = Path(out).resolve()
+        if target in writer:
+            raise click.BadParameter(f"'{writer[target]}' and '{pdf_path}' would both be written to '{out}'.", param_hint="'--pdf'")
+        writer[target] = pdf_path
+    
+    if out_path:
+        Path(out_path).mkdir(parents=True, exist_ok=True)
+    return outs
+
+def _show_prediction(js, prediction):
+    # Add prediction results to JSON
+    js["prediction"] = prediction
+    click.echo("✅ Bioage prediction completed!")
+    
+    # Display key prediction results
+    if isinstance(prediction, dict):
+        click.echo("📊 Prediction Results:")
+        for key, value in prediction.items():
+            if isinstance(value, (int, float)):
+                click.echo(f"  {key}: {value}")
+            elif isinstance(value, dict):
+                click.echo(f"  {key}:")
+                for sub_key, sub_value in value.items():
+                    click.echo(f"    {sub_key}: {sub_value}")
+            else:
+                click.echo(f"  {key}: {value}")
 
-    out = out_path or json_path
+def _write_output(out, js):
     save_json(out, js)
     click.echo(f"Updated JSON written to: {out}")
 
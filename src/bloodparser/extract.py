@@ -1,11 +1,37 @@
 \
 from __future__ import annotations
 from typing import List, Dict, Tuple, Optional
-import pdfplumber
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+import os
 import re
-from rapidfuzz import fuzz
 from .utils import clean_text, find_value_and_unit, parse_number
 
+# Optional PyMuPDF backend (C-backed, much faster than pdfminer).
+# PDF libraries are imported on first use so the CLI starts fast
+PYMUPDF_AVAILABLE = find_spec("pymupdf") is not None
+
+def _pymupdf():
+    import pymupdf
+    # Newer releases print a pymupdf_layout hint to stdout on first table search
+    if hasattr(pymupdf, "no_recommend_layout"):
+        pymupdf.no_recommend_layout()
+    return pymupdf
+
+def _pdfplumber():
+    import pdfplumber
+    return pdfplumber
+
+BACKENDS = ("pymupdf", "pdfplumber")
+DEFAULT_BACKEND = "pymupdf"
+
+def _resolve_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}. Must be one of: {list(BACKENDS)}")
+    if backend == "pymupdf" and not PYMUPDF_AVAILABLE:
+        return "pdfplumber"
+    return backend
+
 def _collect_tables(page) -> List[List[List[str]]]:
     settings = {
         "vertical_strategy": "lines",
@@ -24,6 +50,45 @@ def _collect_tables(page) -> List[List[List[str]]]:
         pass
     return tables
 
+def _collect_tables_mupdf(page) -> List[List[List[str]]]:
+    tables = []
+    try:
+        for tb in page.find_tables(strategy="lines_strict").tables:
+            rows = []
+            for row in tb.extract():
+                rows.append([clean_text(c or "") for c in row])
+            if any(any(cell for cell in row) for row in rows):
+                tables.append(rows)
+    except Exception:
+        pass
+    return tables
+
+# Words whose tops are this close (in points) sit on the same row
+_Y_TOLERANCE = 3
+
+def _group_rows(words) -> List[List[str]]:
+    """Group (top, x0, text) word boxes into rows of words, top to bottom and left to right."""
+    rows = []
+    row_top = None
+    for top, x0, text in sorted(words):
+        if row_top is None or top - row_top > _Y_TOLERANCE:
+            rows.append([])
+            row_top = top
+        rows[-1].append((x0, text))
+    return [[text for _, text in sorted(row)] for row in rows]
+
+def _page_rows(page) -> List[List[str]]:
+    return _group_rows((w["top"], w["x0"], w["text"]) for w in page.extract_words(use_text_flow=True))
+
+def _page_rows_mupdf(page, clip=None) -> List[List[str]]:
+    return _group_rows((w[1], w[0], w[4]) for w in page.get_text("words", clip=clip))
+
+def _page_lines(page) -> List[str]:
+    return [" ".join(row) for row in _page_rows(page)]
+
+def _page_lines_mupdf(page, clip=None) -> List[str]:
+    return [" ".join(row) for row in _page_rows_mupdf(page, clip)]
+
 def _header_indices(rows: List[List[str]]):
     header_idx = None
     cols = {}
@@ -43,6 +108,11 @@ def _header_indices(rows: List[List[str]]):
             return header_idx, cols
     return None, {}
 
+def _triple(test: str, v, u):
+    """A (test, value, unit) triple carrying its case-insensitive dedup key as a 4th item."""
+    # Built in the page workers, so the final merge only does set lookups
+    return (test, v, u, (test.lower(), v, (u or "").lower()))
+
 def _parse_table(rows: List[List[str]]):
     if not rows:
         return []
@@ -62,102 +132,185 @@ def _parse_table(rows: List[List[str]]):
         if v is None:
             v = parse_number(res)
         if test:
-            triples.append((test, v, u))
+            triples.append(_triple(test, v, u))
     return triples
 
-def _parse_text_lines(page):
+# A word starting with a number, optionally prefixed with a comparison sign;
+# the unit may be attached ("120mg/dl", "5.6%")
+_NUM_WORD_RE = re.compile(r"[<>]?-?\d+(?:[\.,]\d+)?")
+
+def _parse_text_lines(rows: List[List[str]]):
+    """Parse rows of words: the first word starting with a number holds the value, the words left of it the name."""
     triples = []
-    text = page.extract_text() or ""
-    lines = text.splitlines()
-    
-    # Process lines in context to handle multi-line entries
-    for i, line in enumerate(lines):
-        s = clean_text(line)
-        if not s:
+    for words in rows:
+        for k, w in enumerate(words):
+            if _NUM_WORD_RE.match(w):
+                break
+        else:
             continue
+        name = clean_text(" ".join(words[:k]))
+        if len(name) <= 2 or not any(ch.isalpha() for ch in name):
+            continue
+        v, u = find_value_and_unit(" ".join(words[k:]))
+        if v is None:
+            v = parse_number(words[k])
+        triples.append(_triple(name, v, u))
+    return triples
+
+# Gender patterns in priority order
+_GENDER_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'gender\s*:?\s*([mfMF]ale)',
+    r'sex\s*:?\s*([mfMF]ale)',
+    r'age/gender\s*:?\s*\d+[Yy]?\s*[0-9M]?\s*[0-9D]?\s*/([mfMF]ale)',
+    r'age\s*:?\s*\d+[Yy]?\s*[0-9M]?\s*[0-9D]?\s*gender\s*:?\s*([mfMF])',
+    r'gender\s*:?\s*([mfMF])\s',  # Gender: F or Gender: M (with space after)
+    r'sex\s*:?\s*([mfMF])\s',  # Sex: F or Sex: M (with space after)
+    r'(male|female)\s*[,/]\s*\d+',  # Male/Female followed by age
+    r'(male|female)\s*,',  # Male/Female followed by comma
+    r'(male|female)\s*,\s*\d+',  # Male/Female followed by comma and age
+    r'([mfMF])\s*[0-9]',  # M/F followed by age - last resort
+)]
+# All patterns fused into one alternation; only used as a prefilter since it
+# reports the leftmost match rather than the highest-priority one
+_GENDER_RE = re.compile("|".join(f"(?:{p.pattern})" for p in _GENDER_PATTERNS), re.IGNORECASE)
+_GENDER_SKIP_RE = re.compile("|".join(re.escape(w) for w in (
+    'criteria', 'diagnosis', 'males and non-pregnant', 'stage male female', 'hdl cholesterol gender',
+)))
+
+def _iter_page_lines(pdf_path: str, backend: str):
+    """Yield the text lines of each page, extracting pages lazily."""
+    if backend == "pymupdf":
+        with _pymupdf().open(pdf_path) as doc:
+            for page in doc:
+                yield _page_lines_mupdf(page)
+    else:
+        with _pdfplumber().open(pdf_path) as pdf:
+            for page in pdf.pages:
+                yield _page_lines(page)
+
+def _scan_gender(pages_lines) -> Optional[str]:
+    """Return the gender from the first matching line, given an iterable of per-page line lists."""
+    for lines in pages_lines:
+        for line in lines:
+            line_clean = clean_text(line)
+            line_lower = line_clean.lower()
             
-        # Look for value and unit in current line
-        v, u = find_value_and_unit(s)
-        if v is not None:
-            # Try to find the parameter name in current line or previous lines
-            param_name = None
-            
-            # First, try to find parameter name in current line
-            idx = s.lower().find(str(int(v)) if v.is_integer() else f"{v}")
-            if idx > 0:
-                left = s[:idx].strip()
-                if len(left) > 2 and any(ch.isalpha() for ch in left):
-                    param_name = left
+            # Skip lines that are just explanatory text
+            if _GENDER_SKIP_RE.search(line_lower):
+                continue
             
-            # If not found, look in previous lines (up to 2 lines back)
-            if not param_name:
-                for j in range(max(0, i-2), i):
-                    prev_line = clean_text(lines[j])
-                    if prev_line and any(ch.isalpha() for ch in prev_line):
-                        # Check if this looks like a parameter name
-                        if (len(prev_line) < 100 and 
-                            not any(word in prev_line.lower() for word in 
-                                   ['comment', 'interpretation', 'range', 'goal', 'level', 'means', 'person', 'diabetes', 'risk', 'treatment', 'factor', 'condition', 'disorder', 'disease', 'inflammation', 'marker', 'assessment', 'evaluation', 'management', 'prevention', 'modification', 'therapy', 'replacement', 'hormone', 'pregnancy', 'obese', 'arthritis', 'autoimmune', 'inflammatory', 'bowel', 'pelvic', 'necrosis', 'infection', 'injury', 'tissue', 'birth', 'control', 'pill', 'estrogen', 'recovery', 'earlier', 'intensity', 'rise', 'unlike', 'influenced', 'hematologic', 'anemia', 'polycythemia', 'sugar', 'stays', 'high', 'healthcare', 'provider', 'change', 'plan', 'integrated', 'preceding', 'weeks', 'affected', 'daily', 'fluctuation', 'exercise', 'recent', 'food', 'intake', 'derivatives', 'carbamylated', 'patients', 'renal', 'failure', 'affect', 'accuracy', 'measurements', 'erythrocyte', 'recovery', 'acute', 'blood', 'loss', 'hemolytic', 'hbss', 'hbcc', 'hbsc', 'falsely', 'lower', 'test', 'results', 'regardless', 'assay', 'method', 'used', 'iron', 'deficiency', 'associated', 'higher', 'presence', 'variants', 'conditions', 'red', 'cell', 'turnover', 'must', 'considered', 'particularly', 'when', 'result', 'does', 'not', 'correlate', 'with', 'glucose', 'levels', 'impaired', 'tolerance', 'igt', 'increased', 'developing', 'type', 'diabetes', 'but', 'does', 'not', 'have', 'yet', 'level', 'above', 'confirmed', 'repeating', 'another', 'day', 'means', 'person', 'has', 'diabetes', 'hrs', 'post', 'meal', 'hour', 'after', 'less', 'than', 'before', 'males', 'smoking', 'tobacco', 'use', 'pressure', 'low', 'hdl', 'sugar', 'free'])):
-                            param_name = prev_line
-                            break
+            # One fused search rejects the vast majority of lines
+            if not _GENDER_RE.search(line_clean):
+                continue
             
-            if param_name:
-                triples.append((param_name, v, u))
+            # Look for gender patterns, first pattern in priority order wins
+            for pattern in _GENDER_PATTERNS:
+                match = pattern.search(line_clean)
+                if match:
+                    gender = match.group(1).lower()
+                    if gender in ['m', 'male']:
+                        return 'male'
+                    elif gender in ['f', 'female']:
+                        return 'female'
     
-    return triples
+    return None
+
+# Top fraction of page 1 treated as the report header
+_HEADER_FRACTION = 0.3
+
+def _header_lines(pdf_path: str, backend: str) -> List[str]:
+    """Text lines from the top band of page 1, where patient details usually sit."""
+    if backend == "pymupdf":
+        with _pymupdf().open(pdf_path) as doc:
+            if doc.page_count == 0:
+                return []
+            page = doc[0]
+            r = page.rect
+            return _page_lines_mupdf(page, clip=(r.x0, r.y0, r.x1, r.y0 + r.height * _HEADER_FRACTION))
+    with _pdfplumber().open(pdf_path, pages=[1]) as pdf:
+        if not pdf.pages:
+            return []
+        page = pdf.pages[0]
+        x0, top, x1, _ = page.bbox
+        return _page_lines(page.crop((x0, top, x1, top + page.height * _HEADER_FRACTION)))
 
-def extract_gender(pdf_path: str) -> Optional[str]:
+def extract_gender(pdf_path: str, backend: str = DEFAULT_BACKEND) -> Optional[str]:
     """Extract gender information from PDF."""
-    gender_patterns = [
-        r'gender\s*:?\s*([mfMF]ale)',
-        r'sex\s*:?\s*([mfMF]ale)',
-        r'age/gender\s*:?\s*\d+[Yy]?\s*[0-9M]?\s*[0-9D]?\s*/([mfMF]ale)',
-        r'age\s*:?\s*\d+[Yy]?\s*[0-9M]?\s*[0-9D]?\s*gender\s*:?\s*([mfMF])',
-        r'gender\s*:?\s*([mfMF])\s',  # Gender: F or Gender: M (with space after)
-        r'sex\s*:?\s*([mfMF])\s',  # Sex: F or Sex: M (with space after)
-        r'(male|female)\s*[,/]\s*\d+',  # Male/Female followed by age
-        r'(male|female)\s*,',  # Male/Female followed by comma
-        r'(male|female)\s*,\s*\d+',  # Male/Female followed by comma and age
-        r'([mfMF])\s*[0-9]',  # M/F followed by age - last resort
-    ]
-    
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            lines = text.splitlines()
-            
-            for line in lines:
-                line_clean = clean_text(line)
-                line_lower = line_clean.lower()
-                
-                # Skip lines that are just explanatory text
-                if any(word in line_lower for word in ['criteria', 'diagnosis', 'males and non-pregnant', 'stage male female', 'hdl cholesterol gender']):
-                    continue
-                
-                # Look for gender patterns
-                for pattern in gender_patterns:
-                    match = re.search(pattern, line_clean, re.IGNORECASE)
-                    if match:
-                        gender = match.group(1).lower()
-                        if gender in ['m', 'male']:
-                            return 'male'
-                        elif gender in ['f', 'female']:
-                            return 'female'
-    
-    return None
+    backend = _resolve_backend(backend)
+    # Fast path: only lay out the header band of page 1
+    gender = _scan_gender([_header_lines(pdf_path, backend)])
+    if gender is None:
+        gender = _scan_gender(_iter_page_lines(pdf_path, backend))
+    return gender
+
+def _page_count(pdf_path: str, backend: str) -> int:
+    if backend == "pymupdf":
+        with _pymupdf().open(pdf_path) as doc:
+            return doc.page_count
+    with _pdfplumber().open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+def _extract_page(pdf_path: str, page_no: int, backend: str = DEFAULT_BACKEND, force_text_scan: bool = False):
+    """
+    Extract triples and text lines from a single page. Runs in a worker process.
+    Free-text parsing only runs on pages where the tables yielded nothing,
+    unless force_text_scan is set.
+    """
+    if backend == "pymupdf":
+        with _pymupdf().open(pdf_path) as doc:
+            page = doc[page_no - 1]
+            tables = _collect_tables_mupdf(page)
+            word_rows = _page_rows_mupdf(page)
+    else:
+        with _pdfplumber().open(pdf_path, pages=[page_no]) as pdf:
+            page = pdf.pages[0]
+            tables = _collect_tables(page)
+            word_rows = _page_rows(page)
 
-def extract_all(pdf_path: str):
     triples = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            for rows in _collect_tables(page):
-                triples.extend(_parse_table(rows))
-            triples.extend(_parse_text_lines(page))
+    for rows in tables:
+        triples.extend(_parse_table(rows))
+    if force_text_scan or not triples:
+        triples.extend(_parse_text_lines(word_rows))
+    return triples, [" ".join(row) for row in word_rows]
+
+# Starting a worker pool costs about 0.1s (each worker re-imports the backend
+# and reopens the PDF) against roughly 15-20ms per page, so it only pays off
+# on long reports
+_POOL_MIN_PAGES = 16
+
+def _extract_pages(pdf_path: str, backend: str, force_text_scan: bool = False):
+    """Return (triples, lines) for every page, in page order."""
+    page_numbers = list(range(1, _page_count(pdf_path, backend) + 1))
+    workers = min(os.cpu_count() or 1, len(page_numbers))
+    if workers <= 1 or len(page_numbers) < _POOL_MIN_PAGES:
+        return [_extract_page(pdf_path, page_no, backend, force_text_scan) for page_no in page_numbers]
+    # Pages are independent, so lay them out across processes;
+    # text layout analysis is CPU-bound and holds the GIL
+    n = len(page_numbers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_extract_page, [pdf_path] * n, page_numbers, [backend] * n, [force_text_scan] * n))
+
+def _dedup(triples):
+    """Drop repeated triples by their precomputed key and strip the key off."""
     seen = set()
     uniq = []
     for t in triples:
-        key = (t[0].lower(), t[1], (t[2] or "").lower())
-        if key not in seen:
-            uniq.append(t)
-            seen.add(key)
+        if t[3] not in seen:
+            uniq.append(t[:3])
+            seen.add(t[3])
     return uniq
+
+def extract_all(pdf_path: str, backend: str = DEFAULT_BACKEND, force_text_scan: bool = False):
+    pages = _extract_pages(pdf_path, _resolve_backend(backend), force_text_scan)
+    return _dedup([t for triples, _ in pages for t in triples])
+
+def extract_everything(pdf_path: str, backend: str = DEFAULT_BACKEND, force_text_scan: bool = False):
+    """
+    Extract lab triples and gender in a single pass over the PDF.
+    Each page's text is extracted once and shared by both parsers.
+    """
+    pages = _extract_pages(pdf_path, _resolve_backend(backend), force_text_scan)
+    triples = _dedup([t for page_triples, _ in pages for t in page_triples])
+    gender = _scan_gender(lines for _, lines in pages)
+    return triples, gender
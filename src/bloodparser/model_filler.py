@@ -5,7 +5,9 @@ This module handles filling null values with mean values for model parameters
 before sending data to SageMaker endpoints.
 """
 
-from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Union
 import click
 
 
@@ -79,6 +81,9 @@ MODEL_PARAMETER_MEANS = {
     }
 }
 
+# Required parameter set per model, frozen once at import
+_REQUIRED = {model: frozenset(means) for model, means in MODEL_PARAMETER_MEANS.items()}
+
 # Mapping from test names to model parameter names
 TEST_NAME_TO_MODEL_PARAM = {
     # CVD parameters
@@ -117,6 +122,35 @@ TEST_NAME_TO_MODEL_PARAM = {
 }
 
 
+def _default_unit(model_param: str) -> Optional[str]:
+    """Unit written for a filled parameter whose row has none (None: always no unit)."""
+    if model_param == "gender":
+        return None  # Gender doesn't have units
+    if "cholesterol" in model_param:
+        return "mg/dl"
+    if "creatinine" in model_param or "urea" in model_param:
+        return "mg/dl"
+    if "hba1c" in model_param:
+        return "%"
+    if "vitamin" in model_param:
+        return "ng/ml"
+    return "units"
+
+
+# Fill lookup per model, built once at import: lowercase test name ->
+# (mean, mean as written into the row, default unit). Test names whose
+# parameter the model does not use are left out
+_FILL_LUT = {
+    model: {
+        test_name: (means[param], str(means[param]), _default_unit(param))
+        for test_name, param in TEST_NAME_TO_MODEL_PARAM.items()
+        if param in means
+    }
+    for model, means in MODEL_PARAMETER_MEANS.items()
+}
+
+
+@lru_cache(maxsize=4096)
 def get_model_parameter_name(test_name: str) -> Optional[str]:
     """
     Map test name to model parameter name.
@@ -130,13 +164,16 @@ def get_model_parameter_name(test_name: str) -> Optional[str]:
     return TEST_NAME_TO_MODEL_PARAM.get(test_name.lower())
 
 
-def fill_null_values_with_means(json_data: Dict[str, Any], model_type: str = "cvd") -> Dict[str, Any]:
+def fill_null_values_with_means(json_data: Dict[str, Any], model_type: str = "cvd", in_place: bool = True, echo: bool = True) -> Dict[str, Any]:
     """
     Fill null values in the JSON data with mean values for the specified model.
     
     Args:
         json_data: The parsed JSON data
         model_type: Type of model ("cvd", "liver", "kidney")
+        in_place: Mutate and return json_data itself (default). Pass False to
+            work on a copy and leave the input untouched.
+        echo: Print one line per filled parameter (written in a single batch)
         
     Returns:
         JSON data with null values filled with means
@@ -144,62 +181,63 @@ def fill_null_values_with_means(json_data: Dict[str, Any], model_type: str = "cv
     if model_type not in MODEL_PARAMETER_MEANS:
         raise ValueError(f"Unknown model type: {model_type}. Must be one of: {list(MODEL_PARAMETER_MEANS.keys())}")
     
-    # Create a deep copy to avoid modifying the original
-    filled_data = json_data.copy()
-    filled_data["data"] = [item.copy() for item in json_data.get("data", [])]
+    if in_place:
+        filled_data = json_data
+        filled_data.setdefault("data", [])
+    else:
+        # Copy the top level and each row so the caller's data is not modified
+        filled_data = json_data.copy()
+        filled_data["data"] = [item.copy() for item in json_data.get("data", [])]
     
     model_means = MODEL_PARAMETER_MEANS[model_type]
+    fills = _FILL_LUT[model_type]
     filled_count = 0
+    msgs = []
     
     click.echo(f"🔧 Filling null values for {model_type.upper()} model...")
     
+    # Complete panels (no null values, gender set) are the common case:
+    # stop at the first null, or skip the fill pass entirely if there is none
+    if filled_data.get("gender") is not None and not any(
+            item.get("value") is None or item.get("value") == "null" for item in filled_data["data"]):
+        click.echo("📊 Total parameters filled: 0")
+        return filled_data
+    
     for item in filled_data["data"]:
-        test_name = item.get("test_name", "")
         current_value = item.get("value")
         
         # Skip if value is not null
         if current_value is not None and current_value != "null":
             continue
             
-        # Get model parameter name
-        model_param = get_model_parameter_name(test_name)
-        if not model_param:
-            continue
-            
-        # Check if this parameter is needed for the current model
-        if model_param not in model_means:
+        # One lookup resolves the model parameter, its mean and its unit;
+        # None if the test is unknown or not needed for the current model
+        test_name = item.get("test_name", "")
+        fill = fills.get(test_name.lower())
+        if fill is None:
             continue
             
         # Fill with mean value
-        mean_value = model_means[model_param]
-        item["value"] = str(mean_value)
-        item["machine_value"] = str(mean_value)
+        mean_value, mean_text, unit = fill
+        item["value"] = mean_text
+        item["machine_value"] = mean_text
         
-        # Update unit if needed (some parameters might need specific units)
-        if model_param in ["gender"]:
-            item["unit"] = None  # Gender doesn't have units
-        elif not item.get("unit"):
-            # Try to infer unit from parameter name
-            if "cholesterol" in model_param:
-                item["unit"] = "mg/dl"
-            elif "creatinine" in model_param or "urea" in model_param:
-                item["unit"] = "mg/dl"
-            elif "hba1c" in model_param:
-                item["unit"] = "%"
-            elif "vitamin" in model_param:
-                item["unit"] = "ng/ml"
-            else:
-                item["unit"] = "units"
+        # Infer the unit from the parameter name if the row has none
+        # (parameters without units always get None)
+        if unit is None or not item.get("unit"):
+            item["unit"] = unit
         
         filled_count += 1
-        click.echo(f"  ✅ Filled {test_name} with mean value: {mean_value}")
+        msgs.append(f"  ✅ Filled {test_name} with mean value: {mean_value}")
     
     # Handle gender field separately
     if filled_data.get("gender") is None:
         filled_data["gender"] = "male" if model_means["gender"] < 0.5 else "female"
-        click.echo(f"  ✅ Filled gender with: {filled_data['gender']}")
+        msgs.append(f"  ✅ Filled gender with: {filled_data['gender']}")
         filled_count += 1
     
+    if echo and msgs:
+        click.echo("\n".join(msgs))
     click.echo(f"📊 Total parameters filled: {filled_count}")
     return filled_data
 
@@ -220,38 +258,55 @@ def get_required_parameters_for_model(model_type: str) -> List[str]:
     return list(MODEL_PARAMETER_MEANS[model_type].keys())
 
 
-def check_model_completeness(json_data: Dict[str, Any], model_type: str = "cvd") -> Dict[str, Any]:
+@dataclass(frozen=True)
+class PreparedData:
+    """Model parameters available in a JSON document, resolved once for repeated completeness checks."""
+    available_params: frozenset
+
+
+def prepare_data(json_data: Dict[str, Any]) -> PreparedData:
     """
-    Check completeness of data for a specific model and show missing parameters.
+    Resolve the model parameters present in the JSON data.
     
     Args:
         json_data: The parsed JSON data
-        model_type: Type of model ("cvd", "liver", "kidney")
         
     Returns:
-        Dictionary with completeness information
+        PreparedData to pass to check_model_completeness in place of json_data
     """
-    if model_type not in MODEL_PARAMETER_MEANS:
-        raise ValueError(f"Unknown model type: {model_type}")
-    
-    model_means = MODEL_PARAMETER_MEANS[model_type]
-    required_params = set(model_means.keys())
-    
     # Get available parameters from JSON data
-    available_params = set()
-    for item in json_data.get("data", []):
-        test_name = item.get("test_name", "")
-        model_param = get_model_parameter_name(test_name)
-        if model_param and model_param in required_params:
-            available_params.add(model_param)
+    available_params = {get_model_parameter_name(item.get("test_name", "")) for item in json_data.get("data", [])}
     
     # Add gender if present
     if json_data.get("gender"):
         available_params.add("gender")
     
-    missing_params = required_params - available_params
-    present_params = required_params & available_params
+    return PreparedData(frozenset(available_params))
+
+
+def check_model_completeness(json_data: Union[Dict[str, Any], PreparedData], model_type: str = "cvd") -> Dict[str, Any]:
+    """
+    Check completeness of data for a specific model and show missing parameters.
+    
+    Args:
+        json_data: The parsed JSON data, or its prepare_data result when the
+            same data is checked several times
+        model_type: Type of model ("cvd", "liver", "kidney")
+        
+    Returns:
+        Dictionary with completeness information
+    """
+    required_params = _REQUIRED.get(model_type)
+    if required_params is None:
+        raise ValueError(f"Unknown model type: {model_type}")
+    
+    if not isinstance(json_data, PreparedData):
+        json_data = prepare_data(json_data)
+    # Both sides are sets, so each is a single C-level set operation
+    present_params = required_params & json_data.available_params
+    missing_params = required_params - json_data.available_params
     
+    # Built fresh on every call, so callers may modify the report
     completeness_info = {
         "model_type": model_type,
         "total_required": len(required_params),
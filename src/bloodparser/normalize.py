@@ -1,13 +1,13 @@
 \
 from __future__ import annotations
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple, Optional
-from rapidfuzz import fuzz
 from pydantic import BaseModel
 import yaml
 
 from .synonyms import PARAM_SYNONYMS
 from .units import convert_value
-from .utils import clean_text
+from .utils import clean_text, keyword_regex
 
 class CanonicalParam(BaseModel):
     name: str
@@ -18,61 +18,109 @@ class CanonicalParam(BaseModel):
 class CanonicalRegistry(BaseModel):
     parameters: List[CanonicalParam]
 
+# The registry is shared by every caller loading the same path; treat it as
+# read-only, since alias maps derived from it are cached by identity
+@lru_cache(maxsize=16)
 def load_registry(path: str) -> CanonicalRegistry:
     with open(path, "r", encoding="utf-8") as f:
         obj = yaml.safe_load(f)
     return CanonicalRegistry(**obj)
 
+# Alias maps keyed by id(registry). The registry is kept in the entry so
+# its id cannot be reused by another object while the entry is alive.
+# Bounded like _FLAT_CACHE. Entries are not invalidated, so a registry must
+# not be mutated after its alias map is built (build a new registry instead)
+_ALIAS_CACHE: Dict[int, Tuple[CanonicalRegistry, Dict[str, List[str]]]] = {}
+
 def _build_alias_map(reg: CanonicalRegistry):
+    hit = _ALIAS_CACHE.get(id(reg))
+    if hit is not None and hit[0] is reg:
+        return hit[1]
     aliases = {}
     for p in reg.parameters:
         names = [p.name]
         if p.name in PARAM_SYNONYMS:
             names += PARAM_SYNONYMS[p.name]
         aliases[p.name] = [clean_text(n).lower() for n in names]
+    if len(_ALIAS_CACHE) >= 32:
+        _ALIAS_CACHE.clear()
+    _ALIAS_CACHE[id(reg)] = (reg, aliases)
     return aliases
 
-def _best_match(test_label: str, aliases, strict_level: int = 1):
-    thresholds = {0: 60, 1: 70, 2: 85}  # Lowered thresholds for better matching
-    threshold = thresholds.get(strict_level, 70)
-    tl = clean_text(test_label).lower()
-    best_name, best_score = None, -1
-    
+def _build_exact_map(aliases) -> Dict[str, str]:
+    """Map each (already cleaned, lowercased) alias to its canonical name; first owner wins."""
+    exact = {}
     for canon, alist in aliases.items():
         for a in alist:
-            # Try multiple matching strategies
-            scores = []
-            
-            # 1. Standard fuzzy matching
-            scores.append(fuzz.WRatio(tl, a))
-            
-            # 2. Partial ratio (for partial matches)
-            scores.append(fuzz.partial_ratio(tl, a))
-            
-            # 3. Token sort ratio (order independent)
-            scores.append(fuzz.token_sort_ratio(tl, a))
-            
-            # 4. Token set ratio (ignores duplicates)
-            scores.append(fuzz.token_set_ratio(tl, a))
-            
-            # 5. Simple contains check (exact substring)
-            if a.lower() in tl or tl in a.lower():
-                scores.append(95)
-            
-            # 6. Word-based matching (check if key words match)
-            test_words = set(tl.split())
-            alias_words = set(a.lower().split())
-            if test_words.intersection(alias_words):
-                word_score = len(test_words.intersection(alias_words)) / len(test_words.union(alias_words)) * 100
-                scores.append(word_score)
-            
-            # Take the best score from all strategies
-            score = max(scores)
-            
-            if score > best_score:
-                best_name, best_score = canon, score
+            exact.setdefault(a, canon)
+    return exact
+
+# Flattened alias lists per alias map, keyed by id() like _ALIAS_CACHE.
+# Bounded like _ALIAS_CACHE
+_FLAT_CACHE: Dict[int, tuple] = {}
+
+def _flatten_aliases(aliases):
+    """(flat aliases, owning canon per alias, word set per alias, word -> alias indices), cached."""
+    hit = _FLAT_CACHE.get(id(aliases))
+    if hit is not None and hit[0] is aliases:
+        return hit[1]
+    flat = [a for alist in aliases.values() for a in alist]
+    owners = [canon for canon, alist in aliases.items() for _ in alist]
+    # Shared by every lookup against this alias map, so kept immutable
+    alias_words = [frozenset(a.split()) for a in flat]
+    token_cols: Dict[str, List[int]] = {}
+    for j, words in enumerate(alias_words):
+        for w in words:
+            token_cols.setdefault(w, []).append(j)
+    if len(_FLAT_CACHE) >= 32:
+        _FLAT_CACHE.clear()
+    _FLAT_CACHE[id(aliases)] = (aliases, (flat, owners, alias_words, token_cols))
+    return flat, owners, alias_words, token_cols
+
+def _best_matches(test_labels, aliases, strict_level: int = 1) -> List[Optional[str]]:
+    """
+    Best canonical name (or None) for each label. Every label is scored against
+    every alias at once with rapidfuzz.process.cdist; the best score over the
+    fuzzy strategies and word overlap must reach the strict_level threshold.
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process
+    thresholds = {0: 60, 1: 70, 2: 85}
+    threshold = thresholds.get(strict_level, 70)
+    labels = [clean_text(l).lower() for l in test_labels]
+    flat, owners, alias_words, token_cols = _flatten_aliases(aliases)
+    if not labels or not flat:
+        return [None] * len(labels)
+    
+    # 1-4. Fuzzy strategies, element-wise max over the (labels x aliases) matrix.
+    # Scores under the threshold can never be picked, so let rapidfuzz cut them off early
+    scores = process.cdist(labels, flat, scorer=fuzz.WRatio, dtype=np.float64, workers=-1, score_cutoff=threshold)
+    for scorer in (fuzz.partial_ratio, fuzz.token_sort_ratio, fuzz.token_set_ratio):
+        np.maximum(scores, process.cdist(labels, flat, scorer=scorer, dtype=np.float64, workers=-1, score_cutoff=threshold), out=scores)
     
-    return best_name if best_score >= threshold else None
+    # 5. Substring containment already scores 100 via partial_ratio; only an
+    # empty string (contained in everything) relies on the flat 95
+    empty_rows = [i for i, l in enumerate(labels) if not l]
+    empty_cols = [j for j, a in enumerate(flat) if not a]
+    scores[empty_rows, :] = np.maximum(scores[empty_rows, :], 95)
+    scores[:, empty_cols] = np.maximum(scores[:, empty_cols], 95)
+    
+    # 6. Word-based Jaccard overlap, counted through an inverted token index
+    inter = np.zeros(scores.shape, dtype=np.float64)
+    label_len = np.empty(len(labels), dtype=np.float64)
+    for i, l in enumerate(labels):
+        words = set(l.split())
+        label_len[i] = len(words)
+        for w in words:
+            cols = token_cols.get(w)
+            if cols:
+                inter[i, cols] += 1
+    union = label_len[:, None] + np.array([len(w) for w in alias_words], dtype=np.float64)[None, :] - inter
+    overlap = inter > 0
+    np.maximum(scores, np.divide(inter, union, out=np.zeros_like(inter), where=overlap) * 100, out=scores, where=overlap)
+    
+    best = scores.argmax(axis=1)
+    return [owners[j] if scores[i, j] >= threshold else None for i, j in enumerate(best)]
 
 def normalize_triples_with_nulls(triples, registry: CanonicalRegistry, strict_level: int = 1):
     """
@@ -81,197 +129,313 @@ def normalize_triples_with_nulls(triples, registry: CanonicalRegistry, strict_le
     """
     # Get normalized results
     norm = normalize_triples(triples, registry, strict_level)
+    return _with_nulls(norm, registry)
+
+def normalize_triples_with_nulls_batch(triples_per_doc, registry: CanonicalRegistry, strict_level: int = 1):
+    """normalize_triples_with_nulls for several documents, matched in one batch."""
+    return [_with_nulls(norm, registry) for norm in normalize_triples_batch(triples_per_doc, registry, strict_level)]
+
+def _with_nulls(norm, registry: CanonicalRegistry):
+    # Create a complete mapping with all canonical parameters in one pass;
+    # each missing parameter gets its own null entry so callers may mutate it
+    return {p.name: norm[p.name] if p.name in norm else {"value": None, "unit": None}
+            for p in registry.parameters}
+
+# Words whose presence (as a substring) marks a label as explanatory text
+_EXPLANATORY_WORDS = frozenset({
+    'comment', 'interpretation', 'range', 'goal', 'level', 'means', 'person', 'diabetes', 'risk',
+    'treatment', 'factor', 'condition', 'disorder', 'disease', 'inflammation', 'marker',
+    'assessment', 'evaluation', 'management', 'prevention', 'modification', 'therapy',
+    'replacement', 'hormone', 'pregnancy', 'obese', 'arthritis', 'autoimmune', 'inflammatory',
+    'bowel', 'pelvic', 'necrosis', 'infection', 'injury', 'tissue', 'birth', 'control', 'pill',
+    'estrogen', 'recovery', 'earlier', 'intensity', 'rise', 'unlike', 'influenced', 'hematologic',
+    'anemia', 'polycythemia', 'sugar', 'stays', 'high', 'healthcare', 'provider', 'change', 'plan',
+    'integrated', 'preceding', 'weeks', 'affected', 'daily', 'fluctuation', 'exercise', 'recent',
+    'food', 'intake', 'derivatives', 'carbamylated', 'patients', 'renal', 'failure', 'affect',
+    'accuracy', 'measurements', 'erythrocyte', 'acute', 'blood', 'loss', 'hemolytic', 'hbss',
+    'hbcc', 'hbsc', 'falsely', 'lower', 'test', 'results', 'regardless', 'assay', 'method', 'used',
+    'iron', 'deficiency', 'associated', 'higher', 'presence', 'variants', 'conditions', 'red',
+    'cell', 'turnover', 'must', 'considered', 'particularly', 'when', 'result', 'does', 'not',
+    'correlate', 'with', 'glucose', 'levels', 'impaired', 'tolerance', 'igt', 'increased',
+    'developing', 'type', 'but', 'have', 'yet', 'above', 'confirmed', 'repeating', 'another', 'day',
+    'has', 'hrs', 'post', 'meal', 'hour', 'after', 'less', 'than', 'before', 'males', 'smoking',
+    'tobacco', 'use', 'pressure', 'low', 'hdl', 'free', 'concentrations', 'about', 'prevalence',
+    'estimated', 'metabolism', 'regulation', 'pth', 'metabolites', 'fibroblast', 'growth',
+    'subject', 'circadian', 'variation', 'reaching', 'peak', 'between', 'secreted', 'dual',
+    'fashion', 'intermittent', 'pulses', 'constitute', 'background', 'continuous', 'secretion',
+    'changes', 'thyroid', 'status', 'typically', 'concordant', 'hyperthyroidism', 'identify',
+    'decreased', 'megaloblastic', 'infantile', 'alcoholism', 'malnutrition', 'scurvy', 'liver',
+    'calculation', 'based', 'categories', 'defined', 'acc', 'kdigo', 'advised', 'estimate', 'using',
+    'cystatin', 'confirmation', 'ckd', 'value', 'category', 'terms', 'ml', 'min', 'sq', 'm',
+})
+# Words whose presence (as a substring) suggests a label is a test name
+_TEST_INDICATORS = frozenset({
+    'test', 'result', 'unit', 'method', 'hplc', 'turbidimetry', 'hexokinase', 'calculated',
+    'certified', 'fasting', 'plasma', 'glucose', 'sensitivity', 'crp', 'glycosylated', 'hemoglobin',
+    'hba1c', 'cholesterol', 'hdl', 'ldl', 'vldl', 'triglyceride', 'creatinine', 'calcium',
+    'phosphorus', 'uric', 'acid', 'vitamin', 'thyroid', 'tsh', 'bilirubin', 'albumin', 'protein',
+    'sodium', 'potassium', 'chloride', 'urea', 'nitrogen', 'bun', 'ast', 'alt', 'alkaline',
+    'phosphatase',
+})
+# Substring semantics are kept (e.g. 'ml' matches inside 'ml/min'), so each
+# set is compiled into one trie-shaped regex rather than tokenised
+_EXPLANATORY_RE = keyword_regex(_EXPLANATORY_WORDS)
+_TEST_INDICATOR_RE = keyword_regex(_TEST_INDICATORS)
+
+# Generic status words that are never a parameter label on their own
+_STATUS_WORDS = frozenset({'high', 'very high', 'low', 'normal', 'optimal', 'above optimal'})
+_ENZYME_STATUS_WORDS = frozenset({'optimal', 'above optimal', 'high', 'low'})
+# Labels from unrelated panels that fuzzy-match the cholesterol parameters
+_CHOLESTEROL_NOISE_RE = keyword_regex(frozenset({
+    'leucocyte', 'count', 'immunoglobulin', 'psa', 'iron', 'thyroid', 'testosterone',
+}))
+_HDL_NOISE_RE = keyword_regex(frozenset({
+    'leucocyte', 'count', 'immunoglobulin', 'psa', 'iron', 'thyroid', 'testosterone', 'lipoprotein',
+}))
+
+# Per-parameter scoring rules: (label, label_lower, value, unit) -> score adjustment
+
+def _score_total_cholesterol(label, label_lower, value, unit):
+    score = 0
+    # Strongly prefer labels that contain the exact parameter name
+    if 'cholesterol' in label_lower and 'total' in label_lower:
+        score += 100
+    # Penalize irrelevant matches
+    if _CHOLESTEROL_NOISE_RE.search(label_lower):
+        score -= 200
+    return score
+
+def _score_hdl_cholesterol(label, label_lower, value, unit):
+    score = 0
+    if 'hdl' in label_lower and 'cholesterol' in label_lower:
+        score += 100
+    if _HDL_NOISE_RE.search(label_lower):
+        score -= 200
+    return score
+
+def _score_ldl_cholesterol(label, label_lower, value, unit):
+    return 100 if 'ldl' in label_lower and 'cholesterol' in label_lower else 0
+
+def _score_vldl_cholesterol(label, label_lower, value, unit):
+    return 100 if 'vldl' in label_lower and 'cholesterol' in label_lower else 0
+
+def _score_hba1c(label, label_lower, value, unit):
+    score = 0
+    if 'hba1c' in label_lower:
+        score += 100
+    elif 'hemoglobin' in label_lower and 'hba' not in label_lower:
+        score -= 50  # Penalize generic hemoglobin matches
+    return score
+
+def _score_phosphorus(label, label_lower, value, unit):
+    if 'phosphorus' in label_lower and 'serum' in label_lower:
+        return 100
+    if 'concentrations' in label_lower or 'about' in label_lower:
+        return -100  # Penalize explanatory text
+    return 0
+
+def _score_vitamin_d(label, label_lower, value, unit):
+    if '25-oh' in label_lower or '25 oh' in label_lower:
+        return 100
+    if 'vitamin d3' in label_lower or 'depura' in label_lower:
+        return -100  # Penalize marketing text
+    return 0
+
+def _score_hs_crp(label, label_lower, value, unit):
+    score = 0
+    if 'hs-crp' in label_lower or 'high sensitivity' in label_lower:
+        score += 100
+    elif 'crp' in label_lower and ('reactive' in label_lower or 'protein' in label_lower):
+        score += 80
+    elif 'reactive' in label_lower and 'protein' in label_lower:
+        score += 60
+    elif 'crp' in label_lower:
+        score += 50
+    elif label_lower in _STATUS_WORDS:
+        score -= 500  # Very strongly penalize generic status words
+    return score
+
+def _score_gfr(label, label_lower, value, unit):
+    score = 0
+    has_comparison = '<' in label or '>' in label or '=' in label
+    if 'gfr' in label_lower and 'estimated' in label_lower:
+        score += 200  # Strongly prefer exact GFR matches
+    elif 'gfr' in label_lower and has_comparison:
+        score += 150  # Prefer GFR with comparison operators
+    elif 'glomerular' in label_lower and 'filtration' in label_lower:
+        score += 100
+    elif 'gfr' in label_lower:
+        score += 80
+    elif 'prevalence' in label_lower or 'estimated' in label_lower:
+        score -= 100  # Penalize explanatory text
+    elif 'glucose' in label_lower:
+        score -= 200  # Strongly penalize glucose matches for GFR
+    elif 'ratio' in label_lower or 'beta' in label_lower or 'cell' in label_lower:
+        score -= 300  # Strongly penalize irrelevant matches
+    elif 'unit' in label_lower or 'ml/min' in label_lower:
+        score -= 200  # Penalize unit descriptions
+    if unit and 'ml/min' in unit.lower():  # Prefer correct GFR units
+        score += 50
+    elif unit is None and has_comparison:  # Prefer GFR with comparison operators
+        score += 40
+    return score
+
+def _score_alt(label, label_lower, value, unit):
+    if 'alt' in label_lower and ('s.g.p.t' in label_lower or 'sgpt' in label_lower):
+        return 100  # Strongly prefer ALT with SGPT
+    if 'alt' in label_lower:
+        return 80
+    if 's.g.p.t' in label_lower or 'sgpt' in label_lower:
+        return 70
+    if 'bilirubin' in label_lower or 'total' in label_lower:
+        return -200  # Strongly penalize bilirubin matches
+    if label_lower in _ENZYME_STATUS_WORDS:
+        return -200  # Strongly penalize generic status words
+    return 0
+
+def _score_ast(label, label_lower, value, unit):
+    if 'ast' in label_lower and ('sgot' in label_lower or 's.g.o.t' in label_lower):
+        return 100  # Strongly prefer AST with SGOT
+    if 'ast' in label_lower:
+        return 80
+    if 'sgot' in label_lower or 's.g.o.t' in label_lower:
+        return 70
+    if 'bilirubin' in label_lower or 'total' in label_lower:
+        return -200  # Strongly penalize bilirubin matches
+    if label_lower in _ENZYME_STATUS_WORDS:
+        return -200  # Strongly penalize generic status words
+    return 0
+
+def _score_tsh(label, label_lower, value, unit):
+    if 'tsh' in label_lower and 'thyroid' not in label_lower:
+        return 50  # Prefer simple TSH matches
+    if 'circadian' in label_lower or 'variation' in label_lower:
+        return -100  # Penalize explanatory text
+    return 0
+
+def _score_fasting_glucose(label, label_lower, value, unit):
+    score = 0
+    if 'glucose' in label_lower and 'fasting' in label_lower:
+        score += 100
+    elif 'eag' in label_lower or 'estimated average glucose' in label_lower:
+        score += 50  # Prefer EAG matches for glucose
+    elif 'gfr' in label_lower or 'glomerular' in label_lower:
+        score -= 200  # Strongly penalize GFR matches for glucose
+    return score
+
+_SCORE_RULES = {
+    'Total Cholesterol': _score_total_cholesterol,
+    'Serum HDL Cholesterol': _score_hdl_cholesterol,
+    'Serum LDL Cholesterol': _score_ldl_cholesterol,
+    'Serum VLDL Cholesterol': _score_vldl_cholesterol,
+    'Hba1c (Glycosylated Hemoglobin)': _score_hba1c,
+    'Serum Phosphorus': _score_phosphorus,
+    'VITAMIN D (25 - OH VITAMIN D)': _score_vitamin_d,
+    'HS-CRP (HIGH SENSITIVITY C-REACTIVE PROTEIN)': _score_hs_crp,
+    'GFR, ESTIMATED': _score_gfr,
+    'Alanine Aminotransferase (ALT)': _score_alt,
+    'Aspartate Aminotransferase (AST)': _score_ast,
+    'Thyroid Stimulating Hormone (TSH)-Ultrasensitive': _score_tsh,
+    'Glucose, Fasting': _score_fasting_glucose,
+}
+
+# Values that look like realistic lab results: canon -> ((low, high, bonus), ...).
+# The first range containing the value gives its bonus
+_VALUE_RANGES = {
+    'Hba1c (Glycosylated Hemoglobin)': ((4.0, 15.0, 30),),
+    'HS-CRP (HIGH SENSITIVITY C-REACTIVE PROTEIN)': ((0.0, 10.0, 30), (200.0, 500.0, 20)),  # high CRP is still valid
+    'Glucose, Fasting': ((50.0, 500.0, 30),),
+    'GFR, ESTIMATED': ((10.0, 200.0, 30),),
+}
+
+def _range_bonus(canon, value) -> int:
+    for low, high, bonus in _VALUE_RANGES.get(canon, ()):
+        if low <= value <= high:
+            return bonus
+    return 0
+
+def _score_match(canon, canon_lower, label, label_lower, value, unit):
+    """Rank a candidate triple for a canonical parameter; higher looks more like the actual lab result."""
+    score = 0
+    
+    # Prefer matches with units
+    if unit is not None:
+        score += 50
+    
+    # Prefer complete test names over abbreviated ones
+    if 'glycosylated' in label_lower and 'hemoglobin' in label_lower:
+        score += 50  # Prefer complete test names
+    elif len(label) < 30:
+        score += 20
+    elif len(label) < 50:
+        score += 10
+    
+    # Prefer labels that don't contain explanatory text
+    if not _EXPLANATORY_RE.search(label_lower):
+        score += 30
     
-    # Create a complete mapping with all canonical parameters
-    complete_norm = {}
-    for param in registry.parameters:
-        if param.name in norm:
-            complete_norm[param.name] = norm[param.name]
-        else:
-            complete_norm[param.name] = {"value": None, "unit": None}
+    # Prefer labels that look like test names
+    if _TEST_INDICATOR_RE.search(label_lower):
+        score += 40
     
-    return complete_norm
+    # Prefer exact parameter name matches
+    if canon_lower in label_lower:
+        score += 60
+    
+    # Parameter-specific bonuses and penalties
+    rule = _SCORE_RULES.get(canon)
+    if rule is not None:
+        score += rule(label, label_lower, value, unit)
+    
+    # Prefer values that look like realistic lab values
+    return score + _range_bonus(canon, value)
 
 def normalize_triples(triples, registry: CanonicalRegistry, strict_level: int = 1):
+    return normalize_triples_batch([triples], registry, strict_level)[0]
+
+def normalize_triples_batch(triples_per_doc, registry: CanonicalRegistry, strict_level: int = 1):
+    """
+    normalize_triples for several documents at once. The labels of every document
+    are matched against the aliases in a single batch, then results are picked per document.
+    """
     aliases = _build_alias_map(registry)
-    out = {}
     by_name = {p.name: p for p in registry.parameters}
     
+    # Lowercase each label once; matching and scoring both work on it
+    lowered_per_doc = [[label.lower() for label, _, _ in triples] for triples in triples_per_doc]
+    keys_per_doc = [[clean_text(l) for l in lowered] for lowered in lowered_per_doc]
+    
+    # Each distinct label is matched once (reports repeat row labels across
+    # sections and across documents), all of them against all aliases in one batch
+    unique = list(dict.fromkeys(k for keys in keys_per_doc for k in keys))
+    best = dict(zip(unique, _best_matches(unique, aliases, strict_level=strict_level)))
+    
+    return [_pick_results(triples, lowered, keys, best, by_name)
+            for triples, lowered, keys in zip(triples_per_doc, lowered_per_doc, keys_per_doc)]
+
+def _pick_results(triples, lowered, keys, best, by_name):
+    """Group one document's triples by matched canonical name and keep the best-scored one for each."""
+    out = {}
+    
     # Group triples by canonical parameter name
     grouped = {}
-    for (label, value, unit) in triples:
-        canon = _best_match(label, aliases, strict_level=strict_level)
+    for (label, value, unit), label_lower, key in zip(triples, lowered, keys):
+        canon = best[key]
         if not canon or value is None:
             continue
         if canon not in grouped:
             grouped[canon] = []
-        grouped[canon].append((label, value, unit))
+        grouped[canon].append((label, label_lower, value, unit))
     
     # For each parameter, pick the best match
     for canon, matches in grouped.items():
         p = by_name[canon]
         
-        # Prioritize matches that look like actual lab results
-        def score_match(label, value, unit):
-            score = 0
-            label_lower = label.lower()
-            
-            # Prefer matches with units
-            if unit is not None:
-                score += 50
-            
-            # Prefer complete test names over abbreviated ones
-            if 'glycosylated' in label_lower and 'hemoglobin' in label_lower:
-                score += 50  # Prefer complete test names
-            elif len(label) < 30:
-                score += 20
-            elif len(label) < 50:
-                score += 10
-            
-            # Prefer labels that don't contain explanatory text
-            explanatory_words = ['comment', 'interpretation', 'range', 'goal', 'level', 'means', 'person', 'diabetes', 'risk', 'treatment', 'factor', 'condition', 'disorder', 'disease', 'inflammation', 'marker', 'assessment', 'evaluation', 'management', 'prevention', 'modification', 'therapy', 'replacement', 'hormone', 'pregnancy', 'obese', 'arthritis', 'autoimmune', 'inflammatory', 'bowel', 'pelvic', 'necrosis', 'infection', 'injury', 'tissue', 'birth', 'control', 'pill', 'estrogen', 'recovery', 'earlier', 'intensity', 'rise', 'unlike', 'influenced', 'hematologic', 'anemia', 'polycythemia', 'sugar', 'stays', 'high', 'healthcare', 'provider', 'change', 'plan', 'integrated', 'preceding', 'weeks', 'affected', 'daily', 'fluctuation', 'exercise', 'recent', 'food', 'intake', 'derivatives', 'carbamylated', 'patients', 'renal', 'failure', 'affect', 'accuracy', 'measurements', 'erythrocyte', 'recovery', 'acute', 'blood', 'loss', 'hemolytic', 'hbss', 'hbcc', 'hbsc', 'falsely', 'lower', 'test', 'results', 'regardless', 'assay', 'method', 'used', 'iron', 'deficiency', 'associated', 'higher', 'presence', 'variants', 'conditions', 'red', 'cell', 'turnover', 'must', 'considered', 'particularly', 'when', 'result', 'does', 'not', 'correlate', 'with', 'glucose', 'levels', 'impaired', 'tolerance', 'igt', 'increased', 'developing', 'type', 'diabetes', 'but', 'does', 'not', 'have', 'yet', 'level', 'above', 'confirmed', 'repeating', 'another', 'day', 'means', 'person', 'has', 'diabetes', 'hrs', 'post', 'meal', 'hour', 'after', 'less', 'than', 'before', 'males', 'smoking', 'tobacco', 'use', 'pressure', 'low', 'hdl', 'sugar', 'free', 'concentrations', 'about', 'prevalence', 'estimated', 'metabolism', 'regulation', 'pth', 'metabolites', 'fibroblast', 'growth', 'factor', 'subject', 'circadian', 'variation', 'reaching', 'peak', 'levels', 'between', 'secreted', 'dual', 'fashion', 'intermittent', 'pulses', 'constitute', 'background', 'continuous', 'secretion', 'changes', 'thyroid', 'status', 'typically', 'associated', 'concordant', 'changes', 'patients', 'hyperthyroidism', 'identify', 'decreased', 'levels', 'megaloblastic', 'anemia', 'infantile', 'alcoholism', 'malnutrition', 'scurvy', 'liver', 'disease', 'calculation', 'based', 'categories', 'defined', 'acc', 'kdigo', 'advised', 'estimate', 'using', 'cystatin', 'confirmation', 'ckd', 'value', 'category', 'terms', 'ml', 'min', 'sq', 'm', 'prevalence', 'estimated']
-            if not any(word in label_lower for word in explanatory_words):
-                score += 30
-            
-            # Prefer labels that look like test names
-            test_indicators = ['test', 'result', 'unit', 'method', 'hplc', 'turbidimetry', 'hexokinase', 'calculated', 'certified', 'fasting', 'plasma', 'glucose', 'sensitivity', 'crp', 'glycosylated', 'hemoglobin', 'hba1c', 'cholesterol', 'hdl', 'ldl', 'vldl', 'triglyceride', 'creatinine', 'calcium', 'phosphorus', 'uric', 'acid', 'vitamin', 'thyroid', 'tsh', 'bilirubin', 'albumin', 'protein', 'sodium', 'potassium', 'chloride', 'urea', 'nitrogen', 'bun', 'ast', 'alt', 'alkaline', 'phosphatase']
-            if any(indicator in label_lower for indicator in test_indicators):
-                score += 40
-                
-            # Strongly prefer labels that contain the exact parameter name
-            if canon == 'Total Cholesterol' and 'cholesterol' in label_lower and 'total' in label_lower:
-                score += 100
-            elif canon == 'Serum HDL Cholesterol' and 'hdl' in label_lower and 'cholesterol' in label_lower:
-                score += 100
-            elif canon == 'Serum LDL Cholesterol' and 'ldl' in label_lower and 'cholesterol' in label_lower:
-                score += 100
-            elif canon == 'Serum VLDL Cholesterol' and 'vldl' in label_lower and 'cholesterol' in label_lower:
-                score += 100
-            
-            # Prefer exact parameter name matches
-            if canon.lower() in label_lower:
-                score += 60
-                
-            # Penalize irrelevant matches
-            if canon == 'Total Cholesterol':
-                if 'leucocyte' in label_lower or 'count' in label_lower or 'immunoglobulin' in label_lower or 'psa' in label_lower or 'iron' in label_lower or 'thyroid' in label_lower or 'testosterone' in label_lower:
-                    score -= 200  # Strongly penalize irrelevant matches
-            elif canon == 'Serum HDL Cholesterol':
-                if 'leucocyte' in label_lower or 'count' in label_lower or 'immunoglobulin' in label_lower or 'psa' in label_lower or 'iron' in label_lower or 'thyroid' in label_lower or 'testosterone' in label_lower or 'lipoprotein' in label_lower:
-                    score -= 200  # Strongly penalize irrelevant matches
-            
-            # Special handling for specific parameters
-            if canon == 'Hba1c (Glycosylated Hemoglobin)':
-                if 'hba1c' in label_lower:
-                    score += 100
-                elif 'hemoglobin' in label_lower and 'hba' not in label_lower:
-                    score -= 50  # Penalize generic hemoglobin matches
-            
-            elif canon == 'Serum Phosphorus':
-                if 'phosphorus' in label_lower and 'serum' in label_lower:
-                    score += 100
-                elif 'concentrations' in label_lower or 'about' in label_lower:
-                    score -= 100  # Penalize explanatory text
-                    
-            elif canon == 'VITAMIN D (25 - OH VITAMIN D)':
-                if '25-oh' in label_lower or '25 oh' in label_lower:
-                    score += 100
-                elif 'vitamin d3' in label_lower or 'depura' in label_lower:
-                    score -= 100  # Penalize marketing text
-                    
-            elif canon == 'HS-CRP (HIGH SENSITIVITY C-REACTIVE PROTEIN)':
-                if 'hs-crp' in label_lower or 'high sensitivity' in label_lower:
-                    score += 100
-                elif 'crp' in label_lower and ('reactive' in label_lower or 'protein' in label_lower):
-                    score += 80
-                elif 'reactive' in label_lower and 'protein' in label_lower:
-                    score += 60
-                elif 'crp' in label_lower:
-                    score += 50
-                elif label_lower in ['high', 'very high', 'low', 'normal', 'optimal', 'above optimal']:
-                    score -= 500  # Very strongly penalize generic status words
-                    
-            elif canon == 'GFR, ESTIMATED':
-                if 'gfr' in label_lower and 'estimated' in label_lower:
-                    score += 200  # Strongly prefer exact GFR matches
-                elif 'gfr' in label_lower and ('<' in label or '>' in label or '=' in label):
-                    score += 150  # Prefer GFR with comparison operators
-                elif 'glomerular' in label_lower and 'filtration' in label_lower:
-                    score += 100
-                elif 'gfr' in label_lower:
-                    score += 80
-                elif 'prevalence' in label_lower or 'estimated' in label_lower:
-                    score -= 100  # Penalize explanatory text
-                elif 'glucose' in label_lower:  # Penalize glucose-related matches
-                    score -= 200  # Strongly penalize glucose matches for GFR
-                elif 'ratio' in label_lower or 'beta' in label_lower or 'cell' in label_lower:
-                    score -= 300  # Strongly penalize irrelevant matches
-                elif 'unit' in label_lower or 'ml/min' in label_lower:
-                    score -= 200  # Penalize unit descriptions
-                    
-            elif canon == 'Alanine Aminotransferase (ALT)':
-                if 'alt' in label_lower and ('s.g.p.t' in label_lower or 'sgpt' in label_lower):
-                    score += 100  # Strongly prefer ALT with SGPT
-                elif 'alt' in label_lower:
-                    score += 80
-                elif 's.g.p.t' in label_lower or 'sgpt' in label_lower:
-                    score += 70
-                elif 'bilirubin' in label_lower or 'total' in label_lower:
-                    score -= 200  # Strongly penalize bilirubin matches
-                elif label_lower in ['optimal', 'above optimal', 'high', 'low']:
-                    score -= 200  # Strongly penalize generic status words
-                    
-            elif canon == 'Aspartate Aminotransferase (AST)':
-                if 'ast' in label_lower and ('sgot' in label_lower or 's.g.o.t' in label_lower):
-                    score += 100  # Strongly prefer AST with SGOT
-                elif 'ast' in label_lower:
-                    score += 80
-                elif 'sgot' in label_lower or 's.g.o.t' in label_lower:
-                    score += 70
-                elif 'bilirubin' in label_lower or 'total' in label_lower:
-                    score -= 200  # Strongly penalize bilirubin matches
-                elif label_lower in ['optimal', 'above optimal', 'high', 'low']:
-                    score -= 200  # Strongly penalize generic status words
-                    
-            elif canon == 'Thyroid Stimulating Hormone (TSH)-Ultrasensitive':
-                if 'tsh' in label_lower and 'thyroid' not in label_lower:
-                    score += 50  # Prefer simple TSH matches
-                elif 'circadian' in label_lower or 'variation' in label_lower:
-                    score -= 100  # Penalize explanatory text
-                    
-            elif canon == 'Glucose, Fasting':
-                if 'glucose' in label_lower and 'fasting' in label_lower:
-                    score += 100
-                elif 'eag' in label_lower or 'estimated average glucose' in label_lower:
-                    score += 50  # Prefer EAG matches for glucose
-                elif 'gfr' in label_lower or 'glomerular' in label_lower:
-                    score -= 200  # Strongly penalize GFR matches for glucose
-                
-            # Prefer values that look like realistic lab values
-            if canon == 'Hba1c (Glycosylated Hemoglobin)':
-                if 4.0 <= value <= 15.0:  # Realistic HbA1c range
-                    score += 30
-            elif canon == 'HS-CRP (HIGH SENSITIVITY C-REACTIVE PROTEIN)':
-                if 0.0 <= value <= 10.0:  # Realistic CRP range
-                    score += 30
-                elif 200.0 <= value <= 500.0:  # High CRP range (still valid)
-                    score += 20
-            elif canon == 'Glucose, Fasting':
-                if 50.0 <= value <= 500.0:  # Realistic glucose range
-                    score += 30
-            elif canon == 'GFR, ESTIMATED':
-                if 10.0 <= value <= 200.0:  # Realistic GFR range
-                    score += 30
-                if unit and 'ml/min' in unit.lower():  # Prefer correct GFR units
-                    score += 50
-                elif unit is None and ('<' in label or '>' in label or '=' in label):  # Prefer GFR with comparison operators
-                    score += 40
-                
-            return score
-        
-        # Sort matches by score and pick the best one
-        best_match = max(matches, key=lambda x: score_match(x[0], x[1], x[2]))
-        label, value, unit = best_match
+        # Sort matches by score and pick the best one; the name is lowered
+        # once here rather than for every candidate
+        canon_lower = canon.lower()
+        best_match = max(matches, key=lambda x: _score_match(canon, canon_lower, *x))
+        label, _, value, unit = best_match
         
         v_conv, final_unit = convert_value(canon, value, unit, p.unit)
         v_rounded = round(v_conv, p.rounding) if p.rounding is not None else v_conv
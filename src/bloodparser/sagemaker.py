@@ -1,35 +1,85 @@
 from __future__ import annotations
+import copy
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 import boto3
 from typing import Dict, Any, Optional, List
 import click
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
+# Optional orjson (C implementation) for payload and response (de)serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+def _dumps(obj) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+def _loads(data: bytes):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+    # Both parse the bytes directly, without first decoding a full str copy
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Runtime clients are shared per region: a larger connection pool for
+# concurrent predictions, TCP keepalive so warm connections survive between
+# calls, and a single attempt so predict_with_retry alone decides on retries
+_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"mode": "standard", "total_max_attempts": 1},
+)
+_CLIENTS: Dict[str, Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _runtime_client(region: str):
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(region)
+        if client is None:
+            client = _CLIENTS[region] = boto3.client('sagemaker-runtime', region_name=region, config=_CLIENT_CONFIG)
+        return client
+
 class SageMakerPredictor:
     """AWS SageMaker endpoint integration for CVD bioage prediction."""
     
-    def __init__(self, endpoint_url: str, region: str = "ap-south-1"):
+    def __init__(self, endpoint_url: str, region: str = "ap-south-1", enable_cache: bool = False, cache_size: int = 128):
         """
         Initialize SageMaker predictor.
         
         Args:
             endpoint_url: The SageMaker endpoint URL
             region: AWS region (default: ap-south-1)
+            enable_cache: Reuse the response for a payload already sent by this predictor.
+                Off by default, since cached predictions outlive a redeployment of the model
+            cache_size: Maximum number of cached responses (least recently used are evicted)
         """
         self.endpoint_url = endpoint_url
         self.region = region
         self.client = None
+        self.enable_cache = enable_cache
+        self.cache_size = cache_size
+        self._response_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._cache_lock = threading.Lock()
         
     def _get_client(self):
         """Get or create SageMaker runtime client."""
         if self.client is None:
             try:
-                self.client = boto3.client('sagemaker-runtime', region_name=self.region)
+                self.client = _runtime_client(self.region)
             except NoCredentialsError:
                 raise Exception("AWS credentials not found. Please configure AWS credentials using 'aws configure' or environment variables.")
         return self.client
     
-    def _prepare_payload(self, json_data: Dict[str, Any]) -> str:
+    def _prepare_payload(self, json_data: Dict[str, Any]) -> bytes:
         """
         Prepare the JSON data for SageMaker endpoint.
         
@@ -37,7 +87,7 @@ class SageMakerPredictor:
             json_data: Parsed JSON data from PDF
             
         Returns:
-            JSON string ready for SageMaker endpoint
+            UTF-8 encoded JSON ready for SageMaker endpoint
         """
         # Send the data in the original format that the endpoint expects
         # The endpoint expects the flat structure with 'data' array
@@ -69,7 +119,7 @@ class SageMakerPredictor:
             }
             payload["data"].append(lab_item)
         
-        return json.dumps(payload)
+        return _dumps(payload)
     
     def predict(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -85,11 +135,22 @@ class SageMakerPredictor:
             Exception: If prediction fails
         """
         try:
-            client = self._get_client()
             payload = self._prepare_payload(json_data)
             
+            # Identical payloads get the cached response instead of a round-trip
+            key = hashlib.blake2b(payload, digest_size=16).hexdigest() if self.enable_cache else None
+            if key is not None:
+                with self._cache_lock:
+                    cached = self._response_cache.get(key)
+                    if cached is not None:
+                        self._response_cache.move_to_end(key)
+                if cached is not None:
+                    click.echo("✅ Prediction served from cache")
+                    return copy.deepcopy(cached)
+            
+            client = self._get_client()
             click.echo(f"Sending data to SageMaker endpoint: {self.endpoint_url}")
-            click.echo(f"Payload size: {len(payload)} characters")
+            click.echo(f"Payload size: {len(payload)} bytes")
             
             # Extract endpoint name from URL - it's the part after 'endpoints/' and before '/invocations'
             endpoint_name = self.endpoint_url.split('/endpoints/')[-1].split('/')[0]
@@ -101,7 +162,13 @@ class SageMakerPredictor:
             )
             
             # Parse response
-            result = json.loads(response['Body'].read().decode('utf-8'))
+            result = _loads(response['Body'].read())
+            
+            if key is not None:
+                with self._cache_lock:
+                    self._response_cache[key] = copy.deepcopy(result)
+                    while len(self._response_cache) > self.cache_size:
+                        self._response_cache.popitem(last=False)
             
             click.echo("✅ Prediction received successfully!")
             return result
@@ -145,20 +212,21 @@ class SageMakerPredictor:
         
         raise last_exception
 
-def create_predictor(endpoint_url: str, region: str = "ap-south-1") -> SageMakerPredictor:
+def create_predictor(endpoint_url: str, region: str = "ap-south-1", enable_cache: bool = False) -> SageMakerPredictor:
     """
     Create a SageMaker predictor instance.
     
     Args:
         endpoint_url: The SageMaker endpoint URL
         region: AWS region
+        enable_cache: Reuse the response for a payload already sent by this predictor (off by default)
         
     Returns:
         SageMakerPredictor instance
     """
-    return SageMakerPredictor(endpoint_url, region)
+    return SageMakerPredictor(endpoint_url, region, enable_cache=enable_cache)
 
-def predict_bioage(json_data: Dict[str, Any], endpoint_url: str, region: str = "ap-south-1") -> Dict[str, Any]:
+def predict_bioage(json_data: Dict[str, Any], endpoint_url: str, region: str = "ap-south-1", enable_cache: bool = False) -> Dict[str, Any]:
     """
     Convenience function to predict bioage from JSON data.
     
@@ -166,9 +234,24 @@ def predict_bioage(json_data: Dict[str, Any], endpoint_url: str, region: str = "
         json_data: Parsed JSON data from PDF
         endpoint_url: The SageMaker endpoint URL
         region: AWS region
+        enable_cache: Reuse earlier responses for identical payloads sent to this
+            endpoint in this process. Off by default, since cached predictions
+            outlive a redeployment of the endpoint's model
         
     Returns:
         Prediction results from SageMaker endpoint
     """
-    predictor = create_predictor(endpoint_url, region)
-    return predictor.predict_with_retry(json_data)
+    return _shared_predictor(endpoint_url, region, enable_cache).predict_with_retry(json_data)
+
+# One predictor per (endpoint, region, caching), so its client and any
+# response cache are reused across predict_bioage calls
+_PREDICTORS: Dict[tuple, SageMakerPredictor] = {}
+_PREDICTORS_LOCK = threading.Lock()
+
+def _shared_predictor(endpoint_url: str, region: str, enable_cache: bool) -> SageMakerPredictor:
+    key = (endpoint_url, region, enable_cache)
+    with _PREDICTORS_LOCK:
+        predictor = _PREDICTORS.get(key)
+        if predictor is None:
+            predictor = _PREDICTORS[key] = create_predictor(endpoint_url, region, enable_cache)
+        return predictor
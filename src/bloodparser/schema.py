@@ -1,8 +1,17 @@
 \
 from __future__ import annotations
+import math
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
+# Optional orjson (C implementation) for writing output JSON
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 class ParamEntry(BaseModel):
     parameter_id: Optional[str] = None
     test_name: str
@@ -30,7 +39,34 @@ def load_json(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def _has_non_finite(obj) -> bool:
+    """True if obj contains a NaN or infinite float anywhere."""
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, float):
+            if not math.isfinite(o):
+                return True
+        elif isinstance(o, dict):
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+    return False
+
 def save_json(path: str, obj: Dict[str, Any]) -> None:
+    # orjson writes NaN and Infinity as null; json.dump keeps them as NaN/Infinity
+    if ORJSON_AVAILABLE and not _has_non_finite(obj):
+        # Same layout as the json.dump below (2-space indent, UTF-8 text),
+        # encoded in C straight to bytes without Python-level str chunks
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # types orjson does not serialize; the json module below reports them
+        else:
+            with open(path, "wb") as f:
+                f.write(data)
+            return
     import json
+    # json.dump writes the encoder's chunks as they are produced
     with open(path, "w", encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
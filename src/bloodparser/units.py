@@ -1,6 +1,6 @@
 \
 from __future__ import annotations
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 # Conversion rules: (param, from_unit, to_unit) -> (factor, offset)
 CONVERSIONS = {
@@ -58,13 +58,20 @@ CONVERSIONS = {
     ("Direct Bilirubin", "mg/dl", "mg/dl"): (1.0, 0.0),
 }
 
+# The same rules regrouped as param -> from_unit -> (factor, offset, to_unit);
+# each parameter has a single target unit, so lookups need no tuple key
+_CONV_BY_PARAM: Dict[str, Dict[str, Tuple[float, float, str]]] = {}
+for (_param, _from, _to), (_factor, _offset) in CONVERSIONS.items():
+    _CONV_BY_PARAM.setdefault(_param, {})[_from] = (_factor, _offset, _to)
+
 def convert_value(param_name: str, value: float, from_unit: Optional[str], to_unit: str) -> Tuple[float, str]:
     # Convert to target unit if rule exists; otherwise return original.
     if from_unit is None:
         return value, to_unit
-    key = (param_name, from_unit, to_unit)
-    if key in CONVERSIONS:
-        factor, offset = CONVERSIONS[key]
+    rules = _CONV_BY_PARAM.get(param_name)
+    rule = rules.get(from_unit) if rules else None
+    if rule is not None and rule[2] == to_unit:
+        factor, offset, _ = rule
         return value * factor + offset, to_unit
     if from_unit.lower() == to_unit.lower():
         return value, to_unit
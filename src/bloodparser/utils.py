@@ -1,15 +1,70 @@
 \
 from __future__ import annotations
 import re
+from functools import lru_cache
 from typing import Optional, Tuple
 
 NUM_RE = re.compile(r"(-?\d+(?:[\.,]\d+)?)")
-UNIT_INLINE_RE = re.compile(r"(-?\d+(?:[\.,]\d+)?)(?:\s*)(%|mg/dl|mg/L|g/dl|pg/mL|ng/ml|µIU/mL|mIU/L|U/L|mmol/L|mEq/L|mL/min/1\.73m2|10\^3/uL|10\^3/µl|10\^6/µl|fL|pg|g/dL|gm/dl|Ratio|mm/1st hour)(?:\s|$)", re.IGNORECASE)
+# Units recognised directly after a value
+UNITS = ("%", "mg/dl", "mg/L", "g/dl", "pg/mL", "ng/ml", "µIU/mL", "mIU/L", "U/L", "mmol/L", "mEq/L", "mL/min/1.73m2",
+         "10^3/uL", "10^3/µl", "10^6/µl", "fL", "pg", "g/dL", "gm/dl", "Ratio", "mm/1st hour")
 
+def _unit_alternation(units) -> str:
+    """Case-insensitive alternation of the units, factored into a trie so shared prefixes are matched once."""
+    trie: dict = {}
+    for u in units:
+        node = trie
+        for ch in u.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # A unit ending here is optional on the way to a longer one
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+# A unit must be followed by whitespace or the end, so at most one unit can
+# match at a given position and the trie order cannot change the result.
+# The number may not start in the middle of a digit run: any match found
+# there would already have matched one digit earlier, and without the guard
+# every start inside a long run of digits re-scans the rest of it (quadratic)
+UNIT_INLINE_RE = re.compile(r"(-?(?<!\d)\d+(?:[\.,]\d+)?)(?:\s*)(" + _unit_alternation(UNITS) + r")(?:\s|$)", re.IGNORECASE)
+_PART_RE = re.compile(r"[^,\s]+")
+_PLAIN_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+
+def keyword_regex(words) -> re.Pattern:
+    """Compile words into one trie-shaped regex that finds any of them as a substring."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    if not trie:
+        return re.compile(r"(?!)")  # never matches
+
+    def build(node) -> str:
+        # A word ending here already satisfies a substring search,
+        # so longer words sharing this prefix can be dropped
+        if "" in node:
+            return ""
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return re.compile(build(trie))
+
+# Non-breaking and zero-width spaces count as ordinary spaces
+_SPACE_TRANS = str.maketrans({"\u00a0": " ", "\u200b": " "})
+
+@lru_cache(maxsize=65536)
 def clean_text(s: str) -> str:
-    s = s.replace("\u00a0", " ").replace("\u200b", " ").strip()
-    s = re.sub(r"\s+", " ", s)
-    return s
+    # str.split() splits on the same whitespace as re's \s, and drops the ends
+    return " ".join(s.translate(_SPACE_TRANS).split())
 
 def parse_number(s: str) -> Optional[float]:
     m = re.search(r"-?\d+(?:[\.,]\d+)?", s)
@@ -37,9 +92,8 @@ def find_value_and_unit(s: str) -> Tuple[Optional[float], Optional[str]]:
     
     # If no unit found, look for standalone numbers that might be values
     # Split by common separators and look for numbers in each part
-    parts = re.split(r'[,\s]+', s2)
-    for part in parts:
-        if re.match(r'^\d+(?:\.\d+)?$', part):
+    for part in _PART_RE.findall(s2):
+        if _PLAIN_NUM_RE.fullmatch(part):
             try:
                 v = float(part)
                 # Check if this looks like a reasonable lab value
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for CLI output naming with one or several PDFs
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+from click.testing import CliRunner
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from bloodparser.cli import main, _output_paths
+
+TEMPLATE = str(Path(__file__).parent / "examples" / "example_schema.json")
+
+
+def _touch(root, *parts):
+    """Create an (empty) placeholder PDF; option checks run before any extraction."""
+    path = Path(root, *parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return str(path)
+
+
+def test_single_pdf_outputs():
+    """One PDF writes to --out, or back to the template without it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = _touch(tmp, "report.pdf")
+        out = str(Path(tmp, "out.json"))
+        assert _output_paths([pdf], TEMPLATE, out) == [out]
+        assert _output_paths([pdf], TEMPLATE, None) == [TEMPLATE]
+
+
+def test_several_pdf_outputs():
+    """Several PDFs write <stem>.json into --out (created), or beside each PDF"""
+    with tempfile.TemporaryDirectory() as tmp:
+        a = _touch(tmp, "a", "first.pdf")
+        b = _touch(tmp, "b", "second.pdf")
+        out_dir = Path(tmp, "outputs")
+        assert _output_paths([a, b], TEMPLATE, str(out_dir)) == [str(out_dir / "first.json"), str(out_dir / "second.json")]
+        assert out_dir.is_dir()
+        assert _output_paths([a, b], TEMPLATE, None) == [str(Path(tmp, "a", "first.json")), str(Path(tmp, "b", "second.json"))]
+
+        # Same name in different folders is fine when outputs go beside the PDFs
+        c = _touch(tmp, "c", "first.pdf")
+        assert _output_paths([a, c], TEMPLATE, None) == [str(Path(tmp, "a", "first.json")), str(Path(tmp, "c", "first.json"))]
+
+
+def test_output_collisions_rejected():
+    """PDFs that would write the same output file are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        a = _touch(tmp, "a", "report.pdf")
+        b = _touch(tmp, "b", "report.pdf")
+        out_dir = Path(tmp, "outputs")
+        for pdfs in ([a, b], [a, a]):
+            try:
+                _output_paths(pdfs, TEMPLATE, str(out_dir))
+            except click.BadParameter:
+                pass
+            else:
+                raise AssertionError(f"{pdfs} should collide")
+        assert not out_dir.exists()
+
+
+def test_bad_out_rejected_before_extraction():
+    """An --out of the wrong kind is a usage error, not a traceback after extraction"""
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as tmp:
+        a = _touch(tmp, "a", "report.pdf")
+        b = _touch(tmp, "b", "report.pdf")
+        out_file = _touch(tmp, "existing.json")
+        cases = [
+            # Directory for one PDF
+            ["--pdf", a, "--out", tmp],
+            # File for several PDFs
+            ["--pdf", a, "--pdf", b, "--out", out_file],
+            # Both PDFs named report.pdf
+            ["--pdf", a, "--pdf", b, "--out", str(Path(tmp, "outputs"))],
+        ]
+        for args in cases:
+            result = runner.invoke(main, args + ["--json", TEMPLATE])
+            assert result.exit_code == 2, (args, result.output)
+            assert "Invalid value" in result.output, result.output
+
+
+if __name__ == "__main__":
+    test_single_pdf_outputs()
+    test_several_pdf_outputs()
+    test_output_collisions_rejected()
+    test_bad_out_rejected_before_extraction()
+    print("✅ CLI output tests passed!")
@@ -3,14 +3,22 @@
 Test script for null value filling functionality
 """
 
-import json
+import io
+import logging
+import os
 import sys
+import tempfile
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from bloodparser.model_filler import fill_null_values_with_means, check_model_completeness
+from bloodparser.model_filler import fill_null_values_with_means, check_model_completeness, prepare_data
+from bloodparser.schema import save_json
+
+# Progress goes through logging; run with LOGLEVEL=WARNING to skip it (and its formatting)
+log = logging.getLogger("bloodparser.tests")
 
 
 def test_null_filling():
@@ -56,59 +64,68 @@ def test_null_filling():
         ]
     }
     
-    print("🧪 Testing Null Value Filling Functionality")
-    print("=" * 50)
+    log.info("🧪 Testing Null Value Filling Functionality")
+    if log.isEnabledFor(logging.INFO):
+        log.info("=" * 50)
+    
+    # The sample data is checked against several models; resolve it once
+    prepared = prepare_data(sample_data)
     
     # Test 1: Check completeness for CVD model
-    print("\n1. Checking data completeness for CVD model:")
-    completeness = check_model_completeness(sample_data, "cvd")
-    print(f"   Required parameters: {completeness['total_required']}")
-    print(f"   Present parameters: {completeness['present']}")
-    print(f"   Missing parameters: {completeness['missing']}")
-    print(f"   Completeness: {completeness['completeness_percentage']:.1f}%")
+    log.info("\n1. Checking data completeness for CVD model:")
+    completeness = check_model_completeness(prepared, "cvd")
+    log.info("   Required parameters: %s", completeness['total_required'])
+    log.info("   Present parameters: %s", completeness['present'])
+    log.info("   Missing parameters: %s", completeness['missing'])
+    log.info("   Completeness: %.1f%%", completeness['completeness_percentage'])
     
-    if completeness['missing_parameters']:
-        print(f"   Missing: {', '.join(completeness['missing_parameters'][:5])}...")
+    if completeness['missing_parameters'] and log.isEnabledFor(logging.INFO):
+        log.info("   Missing: %s...", ', '.join(completeness['missing_parameters'][:5]))
     
     # Test 2: Fill null values for CVD model
-    print("\n2. Filling null values for CVD model:")
-    filled_data = fill_null_values_with_means(sample_data, "cvd")
-    
-    print("\n   Before filling:")
-    for item in sample_data["data"]:
-        if item["value"] is None:
-            print(f"     {item['test_name']}: {item['value']}")
+    log.info("\n2. Filling null values for CVD model:")
+    # The filler reports through click.echo; below INFO its output is discarded too
+    verbose = log.isEnabledFor(logging.INFO)
+    with nullcontext() if verbose else redirect_stdout(io.StringIO()):
+        filled_data = fill_null_values_with_means(sample_data, "cvd", in_place=False, echo=verbose)
     
-    print("\n   After filling:")
-    for item in filled_data["data"]:
-        if item["test_name"] in ["serum creatinine", "serum hdl cholesterol"]:
-            print(f"     {item['test_name']}: {item['value']} {item['unit'] or ''}")
+    if log.isEnabledFor(logging.INFO):
+        log.info("\n   Before filling:")
+        for item in sample_data["data"]:
+            if item["value"] is None:
+                log.info("     %s: %s", item['test_name'], item['value'])
+        
+        log.info("\n   After filling:")
+        for item in filled_data["data"]:
+            if item["test_name"] in ["serum creatinine", "serum hdl cholesterol"]:
+                log.info("     %s: %s %s", item['test_name'], item['value'], item['unit'] or '')
     
     # Test 3: Check completeness after filling
-    print("\n3. Checking completeness after filling:")
+    log.info("\n3. Checking completeness after filling:")
     completeness_after = check_model_completeness(filled_data, "cvd")
-    print(f"   Completeness: {completeness_after['completeness_percentage']:.1f}%")
+    log.info("   Completeness: %.1f%%", completeness_after['completeness_percentage'])
     
     # Test 4: Test with different model types
-    print("\n4. Testing with different model types:")
+    log.info("\n4. Testing with different model types:")
     for model_type in ["cvd", "liver", "kidney"]:
-        completeness = check_model_completeness(sample_data, model_type)
-        print(f"   {model_type.upper()}: {completeness['completeness_percentage']:.1f}% complete")
+        completeness = check_model_completeness(prepared, model_type)
+        log.info("   %s: %.1f%% complete", model_type.upper(), completeness['completeness_percentage'])
     
-    # Test 5: Save filled data
-    output_file = "test_filled_data.json"
-    with open(output_file, "w") as f:
-        json.dump(filled_data, f, indent=2)
-    print(f"\n5. Filled data saved to: {output_file}")
+    # Test 5: Save filled data (to a scratch directory, so runs leave no files behind)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "test_filled_data.json")
+        save_json(output_file, filled_data)
+        log.info("\n5. Filled data saved to: %s", output_file)
     
-    print("\n✅ Null filling test completed successfully!")
+    log.info("\n✅ Null filling test completed successfully!")
 
 
 def test_cli_integration():
     """Test CLI integration with null filling"""
     
-    print("\n🔧 Testing CLI Integration")
-    print("=" * 30)
+    log.info("\n🔧 Testing CLI Integration")
+    if log.isEnabledFor(logging.INFO):
+        log.info("=" * 30)
     
     # Test commands
     commands = [
@@ -127,9 +144,10 @@ def test_cli_integration():
     ]
     
     for cmd in commands:
-        print(cmd)
+        log.info(cmd)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"), format="%(message)s", stream=sys.stdout)
     test_null_filling()
     test_cli_integration()
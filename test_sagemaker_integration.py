@@ -4,93 +4,154 @@ Test script for SageMaker integration functionality.
 This script demonstrates how to use the blood PDF parser with SageMaker prediction.
 """
 
+import io
 import json
+import logging
+import os
 import subprocess
 import sys
+import tempfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 
-def test_basic_parsing():
-    """Test basic PDF parsing without SageMaker."""
-    print("=== TESTING BASIC PDF PARSING ===")
-    
-    cmd = [
+# Scenario files are relative to this script, wherever it is run from
+ROOT = Path(__file__).parent
+
+# Add src to path
+sys.path.insert(0, str(ROOT / "src"))
+
+from bloodparser.schema import load_json
+
+# Progress goes through logging; run with LOGLEVEL=WARNING to skip it (and its formatting)
+log = logging.getLogger("bloodparser.tests")
+
+# Scenarios call the CLI in this interpreter unless run with --isolated,
+# which starts a fresh `python -m bloodparser.cli` process for each (as in CI)
+ISOLATED = '--isolated' in sys.argv[1:]
+
+# Optional ijson for checking output files without loading them whole
+try:
+    import ijson
+    JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_ERRORS = (json.JSONDecodeError,)
+
+PDF = str(ROOT / '93393c1e-8b44-4018-8ab9-7afc903f5aef.pdf')
+# Parsed values of the PDF, shared by all scenarios: only the first run
+# extracts, the others reuse it and differ only in the prediction step.
+# The cache lives in a directory of its own for this run, removed at exit,
+# so every run starts by extracting with the current code
+_CACHE_DIR = tempfile.TemporaryDirectory(prefix='bloodparser_test_')
+PARSED_CACHE = str(Path(_CACHE_DIR.name) / 'parsed.json')
+
+def _cli_cmd(out, *extra):
+    return [
         sys.executable, '-m', 'bloodparser.cli',
-        '--pdf', '93393c1e-8b44-4018-8ab9-7afc903f5aef.pdf',
-        '--json', 'examples/example_schema.json',
-        '--out', 'test_basic_output.json'
+        '--pdf', PDF,
+        '--json', str(ROOT / 'examples' / 'example_schema.json'),
+        '--out', str(ROOT / out),
+        '--cache-parsed', PARSED_CACHE,
+        *extra
     ]
-    
+
+BASIC_CMD = _cli_cmd('test_basic_output.json')
+SAGEMAKER_CMD = _cli_cmd('test_sagemaker_output.json', '--predict')
+CUSTOM_ENDPOINT_CMD = _cli_cmd(
+    'test_custom_endpoint_output.json',
+    '--predict',
+    '--sagemaker', 'https://runtime.sagemaker.ap-south-1.amazonaws.com/endpoints/custom-endpoint/invocations/',
+    '--aws-region', 'ap-south-1'
+)
+
+def _run(cmd):
+    """Run one CLI scenario; returns the CompletedProcess, or the exception that prevented it."""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=Path(__file__).parent)
-        if result.returncode == 0:
-            print("✅ Basic parsing successful")
-            print("Output:", result.stdout.strip())
-            return True
-        else:
-            print("❌ Basic parsing failed")
-            print("Error:", result.stderr.strip())
-            return False
+        if ISOLATED:
+            # Captured as bytes; decoded only if the output is shown
+            return subprocess.run(cmd, capture_output=True, cwd=ROOT)
+        return _run_in_process(cmd)
     except Exception as e:
-        print(f"❌ Error running basic parsing: {e}")
-        return False
+        return e
 
-def test_sagemaker_integration():
-    """Test SageMaker integration (without actual endpoint call)."""
-    print("\n=== TESTING SAGEMAKER INTEGRATION ===")
+def _run_in_process(cmd):
+    """Call the CLI's main directly, capturing its output and exit code like subprocess.run."""
+    from bloodparser.cli import main as cli_main
     
-    cmd = [
-        sys.executable, '-m', 'bloodparser.cli',
-        '--pdf', '93393c1e-8b44-4018-8ab9-7afc903f5aef.pdf',
-        '--json', 'examples/example_schema.json',
-        '--out', 'test_sagemaker_output.json',
-        '--predict'
-    ]
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=Path(__file__).parent)
-        if result.returncode == 0:
-            print("✅ SageMaker integration test successful")
-            print("Output:", result.stdout.strip())
-            return True
-        else:
-            print("❌ SageMaker integration test failed")
-            print("Error:", result.stderr.strip())
-            return False
-    except Exception as e:
-        print(f"❌ Error running SageMaker integration test: {e}")
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            cli_main.main(args=cmd[3:], prog_name='bloodparser.cli')
+            returncode = 0
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+    return subprocess.CompletedProcess(cmd, returncode, out.getvalue(), err.getvalue())
+
+def _text(output):
+    """Captured output as text; isolated runs capture bytes, decoded here on demand."""
+    return output.decode('utf-8', errors='replace') if isinstance(output, bytes) else output
+
+def _report(result, name, label):
+    """Print the outcome of a scenario run by _run and return whether it passed."""
+    if isinstance(result, Exception):
+        log.error("❌ Error running %s: %s", label, result)
         return False
+    if result.returncode == 0:
+        log.info("✅ %s successful", name)
+        if log.isEnabledFor(logging.INFO):
+            log.info("Output: %s", _text(result.stdout).strip())
+        return True
+    log.error("❌ %s failed", name)
+    log.error("Error: %s", _text(result.stderr).strip())
+    return False
 
-def test_custom_endpoint():
+def test_basic_parsing(result=None):
+    """Test basic PDF parsing without SageMaker."""
+    log.info("=== TESTING BASIC PDF PARSING ===")
+    return _report(result or _run(BASIC_CMD), "Basic parsing", "basic parsing")
+
+def test_sagemaker_integration(result=None):
+    """Test SageMaker integration (without actual endpoint call)."""
+    log.info("\n=== TESTING SAGEMAKER INTEGRATION ===")
+    return _report(result or _run(SAGEMAKER_CMD), "SageMaker integration test", "SageMaker integration test")
+
+def test_custom_endpoint(result=None):
     """Test with custom SageMaker endpoint."""
-    print("\n=== TESTING CUSTOM ENDPOINT ===")
-    
-    cmd = [
-        sys.executable, '-m', 'bloodparser.cli',
-        '--pdf', '93393c1e-8b44-4018-8ab9-7afc903f5aef.pdf',
-        '--json', 'examples/example_schema.json',
-        '--out', 'test_custom_endpoint_output.json',
-        '--predict',
-        '--sagemaker', 'https://runtime.sagemaker.ap-south-1.amazonaws.com/endpoints/custom-endpoint/invocations/',
-        '--aws-region', 'ap-south-1'
-    ]
+    log.info("\n=== TESTING CUSTOM ENDPOINT ===")
+    return _report(result or _run(CUSTOM_ENDPOINT_CMD), "Custom endpoint test", "custom endpoint test")
+
+def _output_keys(path):
+    """Top-level keys of an output file, and the prediction's keys (None without a prediction)."""
+    if ijson is None:
+        data = load_json(path)
+        if not isinstance(data, dict):
+            return set(), None
+        prediction = data.get('prediction')
+        return set(data), list(prediction.keys()) if isinstance(prediction, dict) else None
     
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=Path(__file__).parent)
-        if result.returncode == 0:
-            print("✅ Custom endpoint test successful")
-            print("Output:", result.stdout.strip())
-            return True
-        else:
-            print("❌ Custom endpoint test failed")
-            print("Error:", result.stderr.strip())
-            return False
-    except Exception as e:
-        print(f"❌ Error running custom endpoint test: {e}")
-        return False
+    # Stream the parse events, keeping only map keys; nothing else is built
+    keys, prediction_keys = set(), None
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if event == 'map_key':
+                if prefix == '':
+                    keys.add(value)
+                elif prefix == 'prediction':
+                    prediction_keys.append(value)
+            elif prefix == 'prediction' and event == 'start_map':
+                prediction_keys = []
+            elif prefix == 'prediction' and event == 'end_map' and {'data', 'gender'} <= keys:
+                break  # everything checked has been seen
+    return keys, prediction_keys
 
 def check_output_files():
     """Check if output files were created correctly."""
-    print("\n=== CHECKING OUTPUT FILES ===")
+    log.info("\n=== CHECKING OUTPUT FILES ===")
     
     output_files = [
         'test_basic_output.json',
@@ -99,60 +160,70 @@ def check_output_files():
     ]
     
     for file_path in output_files:
-        if Path(file_path).exists():
+        if (ROOT / file_path).exists():
             try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
+                keys, prediction_keys = _output_keys(ROOT / file_path)
                 
                 # Check basic structure
-                if 'data' in data and 'gender' in data:
-                    print(f"✅ {file_path}: Valid JSON structure")
+                if 'data' in keys and 'gender' in keys:
+                    log.info("✅ %s: Valid JSON structure", file_path)
                     
                     # Check if prediction was attempted
-                    if 'prediction' in data:
-                        print(f"  📊 Prediction data found: {list(data['prediction'].keys())}")
+                    if prediction_keys is not None:
+                        log.info("  📊 Prediction data found: %s", prediction_keys)
                     else:
-                        print(f"  ℹ️  No prediction data (expected without AWS credentials)")
+                        log.info("  ℹ️  No prediction data (expected without AWS credentials)")
                 else:
-                    print(f"❌ {file_path}: Invalid JSON structure")
-            except json.JSONDecodeError:
-                print(f"❌ {file_path}: Invalid JSON format")
+                    log.error("❌ %s: Invalid JSON structure", file_path)
+            except JSON_ERRORS:
+                log.error("❌ %s: Invalid JSON format", file_path)
         else:
-            print(f"❌ {file_path}: File not found")
+            log.error("❌ %s: File not found", file_path)
 
 def main():
     """Run all tests."""
-    print("🧪 SAGEMAKER INTEGRATION TEST SUITE")
-    print("=" * 50)
+    log.info("🧪 SAGEMAKER INTEGRATION TEST SUITE")
+    if log.isEnabledFor(logging.INFO):
+        log.info("=" * 50)
     
-    # Test basic functionality
+    # Test basic functionality; this run also fills the parsed-PDF cache
     basic_success = test_basic_parsing()
     
+    # The two prediction scenarios are independent: separate processes run
+    # concurrently, in-process runs share sys.stdout so they go one at a time
+    if ISOLATED:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sagemaker_result, custom_result = executor.map(_run, [SAGEMAKER_CMD, CUSTOM_ENDPOINT_CMD])
+    else:
+        sagemaker_result, custom_result = map(_run, [SAGEMAKER_CMD, CUSTOM_ENDPOINT_CMD])
+    
     # Test SageMaker integration
-    sagemaker_success = test_sagemaker_integration()
+    sagemaker_success = test_sagemaker_integration(sagemaker_result)
     
     # Test custom endpoint
-    custom_success = test_custom_endpoint()
+    custom_success = test_custom_endpoint(custom_result)
     
     # Check output files
     check_output_files()
     
     # Summary
-    print("\n" + "=" * 50)
-    print("📋 TEST SUMMARY")
-    print(f"Basic Parsing: {'✅ PASS' if basic_success else '❌ FAIL'}")
-    print(f"SageMaker Integration: {'✅ PASS' if sagemaker_success else '❌ FAIL'}")
-    print(f"Custom Endpoint: {'✅ PASS' if custom_success else '❌ FAIL'}")
+    if log.isEnabledFor(logging.INFO):
+        log.info("\n" + "=" * 50)
+        log.info("📋 TEST SUMMARY")
+        log.info("Basic Parsing: %s", '✅ PASS' if basic_success else '❌ FAIL')
+        log.info("SageMaker Integration: %s", '✅ PASS' if sagemaker_success else '❌ FAIL')
+        log.info("Custom Endpoint: %s", '✅ PASS' if custom_success else '❌ FAIL')
     
     if all([basic_success, sagemaker_success, custom_success]):
-        print("\n🎉 ALL TESTS PASSED!")
-        print("The SageMaker integration is working correctly.")
-        print("\nTo use with real AWS credentials:")
-        print("1. Configure AWS credentials: aws configure")
-        print("2. Run: python -m bloodparser.cli --pdf your.pdf --json template.json --out output.json --predict")
+        log.info("\n🎉 ALL TESTS PASSED!")
+        log.info("The SageMaker integration is working correctly.")
+        log.info("\nTo use with real AWS credentials:")
+        log.info("1. Configure AWS credentials: aws configure")
+        log.info("2. Run: python -m bloodparser.cli --pdf your.pdf --json template.json --out output.json --predict")
     else:
-        print("\n❌ SOME TESTS FAILED")
-        print("Please check the error messages above.")
+        log.error("\n❌ SOME TESTS FAILED")
+        log.error("Please check the error messages above.")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"), format="%(message)s", stream=sys.stdout)
     main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for free-text line parsing
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from bloodparser.extract import _parse_text_lines
+
+
+def _parse(line):
+    """(name, value, unit) triples parsed from one line of words"""
+    return [t[:3] for t in _parse_text_lines([line.split()])]
+
+
+def test_separate_units():
+    """A value word followed by its unit word"""
+    assert _parse("Hemoglobin 14.1 g/dL 13-17") == [("Hemoglobin", 14.1, "g/dL")]
+    assert _parse("Glucose Fasting 92 mg/dl") == [("Glucose Fasting", 92.0, "mg/dl")]
+
+
+def test_attached_units():
+    """Units written straight after the value, with no space"""
+    cases = {
+        "HbA1c 5.6%": ("HbA1c", 5.6, "%"),
+        "Glucose Fasting 120mg/dl": ("Glucose Fasting", 120.0, "mg/dl"),
+        "Creatinine: 0.9mg/dL": ("Creatinine:", 0.9, "mg/dL"),
+        "Serum Sodium 140mmol/L": ("Serum Sodium", 140.0, "mmol/L"),
+        "Hemoglobin 14.1g/dL 13-17": ("Hemoglobin", 14.1, "g/dL"),
+    }
+    for line, expected in cases.items():
+        assert _parse(line) == [expected], (line, _parse(line))
+
+
+def test_lines_without_values_skipped():
+    """Lines with no number, or no usable name, give no triple"""
+    assert _parse("Complete Blood Count") == []
+    assert _parse("12 14.1 g/dL") == []
+
+
+if __name__ == "__main__":
+    test_separate_units()
+    test_attached_units()
+    test_lines_without_values_skipped()
+    print("✅ Text line tests passed!")